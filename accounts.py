@@ -0,0 +1,90 @@
+"""User creation in a single transaction.
+
+Duplicate usernames and emails are caught by the unique constraints rather
+than by SELECTs beforehand, so two concurrent signups for the same name
+can't both get through. Routes still call ensure_available() before hashing
+the password: one indexed lookup is much cheaper than a bcrypt hash that
+would be thrown away, and the constraints still settle concurrent signups.
+"""
+from sqlalchemy import or_, text
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import User, Student, Instructor
+
+DUPLICATE_MESSAGES = {
+    'username': 'Username already exists',
+    'email': 'Email already exists',
+}
+FIRST_USER_MESSAGE = 'The first user (id=1) must be an admin'
+
+
+class AccountError(ValueError):
+    pass
+
+
+def duplicate_field(error):
+    """'username' or 'email' when ``error`` is a unique violation on that column, else None."""
+    diag = getattr(error.orig, 'diag', None)
+    # Postgres names the constraint (user_email_key); SQLite only says "UNIQUE constraint failed: user.email".
+    detail = getattr(diag, 'constraint_name', None) or str(error.orig)
+    for field in DUPLICATE_MESSAGES:
+        if f'_{field}_key' in detail or f'.{field}' in detail:
+            return field
+    return None
+
+
+def ensure_available(username, email):
+    """Raise AccountError when the username or email is already taken."""
+    rows = db.session.query(User.username, User.email).filter(
+        or_(User.username == username, User.email == email)).limit(2).all()
+    if any(row.username == username for row in rows):
+        raise AccountError(DUPLICATE_MESSAGES['username'])
+    if rows:
+        raise AccountError(DUPLICATE_MESSAGES['email'])
+
+
+def add_user(username, email, password_hash, is_admin=False, is_instructor=False, is_student=False):
+    """Add and flush a User with its Student or Instructor profile; the caller commits.
+
+    Raises AccountError with the message for the client, after rolling the
+    session back, when the username or email is taken or the roles are invalid.
+    """
+    user = User(username=username, email=email, password=password_hash,
+                is_admin=is_admin, is_instructor=is_instructor, is_student=is_student)
+    try:
+        user.validate_role_flags()
+    except ValueError as e:
+        raise AccountError(str(e))
+    if is_student:
+        user.student = Student()
+    if is_instructor:
+        user.instructor = Instructor(is_instructor_verified=False)
+    db.session.add(user)
+    try:
+        db.session.flush()
+        user.validate_roles()
+    except IntegrityError as e:
+        db.session.rollback()
+        field = duplicate_field(e)
+        if field is None:
+            raise
+        raise AccountError(DUPLICATE_MESSAGES[field])
+    except ValueError as e:
+        first_user = user.id == 1
+        message = FIRST_USER_MESSAGE if first_user and not user.is_admin else str(e)
+        db.session.rollback()
+        if first_user:
+            _restart_user_ids()
+        raise AccountError(message)
+    return user
+
+
+def _restart_user_ids():
+    # The rolled-back INSERT still used up id 1 of the Postgres sequence; give
+    # it back so the admin signing up next on this empty database gets id 1.
+    # Never below the ids already taken: another signup may have committed
+    # meanwhile, and restarting under it would collide on the next insert.
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text(
+            "SELECT setval(pg_get_serial_sequence('\"user\"', 'id'), coalesce(max(id), 0) + 1, false) FROM \"user\""))
+        db.session.commit()
@@ -1,48 +1,37 @@
 from flask import Flask, request, jsonify
-from flask_marshmallow import Marshmallow
 from flask_migrate import Migrate
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from dotenv import load_dotenv
 from flask_cors import CORS
-from config import Config
+from werkzeug.middleware.proxy_fix import ProxyFix
+from config import Config, check_environment
 from production import ProductionConfig
-from sqlalchemy import text
 import os
 import logging
-from extensions import db, bcrypt, jwt
+import metrics
+import compression
+from extensions import db, jwt, password_hasher
+from schemas import ma
+from passwords import PasswordServiceBusy
+from ratelimit import RateLimited, rate_limiter
+from revocation import revocations
 from routes.admin_routes import admin_bp
 from routes.auth_route import auth_bp
 from routes.student_route import student_bp
 from routes.instructor_route import instructor_bp
-from models import Course, User  
-from schemas import CourseSchema
+from routes.course_route import course_bp
+from pagination import PaginationError
+from fieldsets import FieldsError
+from search import SearchError
+from cache import catalog_cache
+from storage import image_storage
+from commands import register_commands
 
 
 load_dotenv()
 
-app = Flask(__name__)
+migrate = Migrate()
 
 
-if os.getenv('FLASK_ENV') == 'production':
-    app.config.from_object(ProductionConfig)
-else:
-    app.config.from_object(Config)
-
-
-logging.basicConfig(level=logging.DEBUG)
-logger = logging.getLogger(__name__)
-
-
-CORS(app, resources={r"/*": {"origins": "*", "allow_headers": "*", "expose_headers": "*"}})
-
-
-db.init_app(app)
-ma = Marshmallow(app)
-migrate = Migrate(app, db)
-bcrypt.init_app(app)
-jwt.init_app(app)
-
-@app.before_request
 def handle_preflight():
     if request.method == "OPTIONS":
         response = jsonify({"message": "CORS Preflight OK"})
@@ -52,7 +41,6 @@ def handle_preflight():
         response.headers["Content-Type"] = "application/json"
         return response, 200
 
-@app.after_request
 def add_cors_headers(response):
     response.headers["Access-Control-Allow-Origin"] = "*"
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS"
@@ -62,88 +50,85 @@ def add_cors_headers(response):
     return response
 
 
-app.register_blueprint(admin_bp, url_prefix='/api/admin')
-app.register_blueprint(auth_bp, url_prefix='/api/auth')
-app.register_blueprint(student_bp, url_prefix='/api/students')
-app.register_blueprint(instructor_bp, url_prefix='/api/instructors')
-
-
-def jwt_required_optional(fn):
-    def wrapper(*args, **kwargs):
-        if request.method == 'OPTIONS':
-            logger.debug(f"Handling OPTIONS request for {request.path}")
-            return '', 200
-        return jwt_required()(fn)(*args, **kwargs)
-    wrapper.__name__ = fn.__name__
-    return wrapper
-
-@app.route('/api/courses', methods=['GET', 'OPTIONS'])
-@jwt_required_optional
-def get_courses():
-    if request.method == 'OPTIONS':
-        logger.debug("Handling OPTIONS request for /api/courses")
-        return '', 200
-    try:
-        logger.debug("Fetching all courses")
-        courses = Course.query.all()
-        logger.debug(f"Found {len(courses)} courses")
-        result = CourseSchema(many=True).dump(courses)
-        logger.debug("Courses serialized successfully")
-        return result, 200
-    except Exception as e:
-        logger.error(f"Error in get_courses: {str(e)}", exc_info=True)
-        return jsonify({"error": f"Failed to fetch courses: {str(e)}"}), 500
-
-@app.route('/api/courses/<int:course_id>', methods=['GET', 'OPTIONS'])
-@jwt_required_optional
-def get_course(course_id):
-    if request.method == 'OPTIONS':
-        logger.debug(f"Handling OPTIONS request for /api/courses/{course_id}")
-        return '', 200
-    try:
-        logger.debug(f"Fetching course with ID: {course_id}")
-        course = Course.query.get_or_404(course_id)
-        logger.debug("Course found, serializing data")
-        result = CourseSchema().dump(course)
-        return result, 200
-    except Exception as e:
-        logger.error(f"Error fetching course {course_id}: {str(e)}", exc_info=True)
-        return jsonify({"error": f"Failed to fetch course: {str(e)}"}), 500
-
-with app.app_context():
-    try:
-        db.create_all()
-        db.session.execute(text('SELECT 1'))
-        print("Database connection successful and tables created!")
-        # Seed admin user
-        if not User.query.filter_by(username="admin").first():
-            admin = User(
-                username="admin",
-                email="admin@example.com",
-                password=bcrypt.generate_password_hash("admin123"),
-                is_admin=True,
-                is_instructor=False,
-                is_student=False
-            )
-            db.session.add(admin)
-            db.session.commit()
-            print("Admin user seeded")
-        
-        if not User.query.filter_by(username="instructor1").first():
-            instructor = User(
-                username="instructor1",
-                email="instructor1@example.com",
-                password=bcrypt.generate_password_hash("instructor123"),
-                is_admin=False,
-                is_instructor=True,
-                is_student=False
-            )
-            db.session.add(instructor)
-            db.session.commit()
-            print("Instructor1 user seeded")
-    except Exception as e:
-        print(f"Database connection failed: {e}")
+def handle_bad_query(e):
+    return jsonify({"error": str(e)}), 400
+
+def handle_password_service_busy(e):
+    return jsonify({"error": "Server busy, please retry shortly"}), 503, {"Retry-After": "1"}
+
+def handle_rate_limited(e):
+    return jsonify({"error": "Too many requests, please retry later"}), 429, {"Retry-After": str(e.retry_after)}
+
+
+def create_app(config_object=None):
+    """Build the application.
+
+    Nothing here touches the database or the network: tables are created
+    with ``flask init-db`` (or ``flask db upgrade``) and the default accounts
+    with ``flask seed``. Without ``config_object`` the config is picked from
+    FLASK_ENV and the required environment variables are checked.
+    """
+    app = Flask(__name__)
+
+    if config_object is None:
+        check_environment()
+        config_object = ProductionConfig if os.getenv('FLASK_ENV') == 'production' else Config
+    app.config.from_object(config_object)
+
+    logging.basicConfig(level=logging.DEBUG if app.debug else logging.INFO)
+
+    if app.config.get('PROXY_FIX_X_FOR'):
+        # Behind a load balancer, remote_addr (used for per-IP rate limits) is the proxy.
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'], x_proto=1)
+
+    catalog_cache.init_app(app)
+    metrics.init_app(app)
+    rate_limiter.init_app(app)
+    compression.init_app(app)
+
+    CORS(app, resources={r"/*": {"origins": "*", "allow_headers": "*", "expose_headers": "*"}})
+
+    db.init_app(app)
+    ma.init_app(app)
+    migrate.init_app(app, db)
+    jwt.init_app(app)
+    revocations.init_app(app)
+    password_hasher.init_app(app)
+    image_storage.init_app(app)
+
+    app.before_request(handle_preflight)
+    app.after_request(add_cors_headers)
+
+    app.register_blueprint(admin_bp, url_prefix='/api/admin')
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(student_bp, url_prefix='/api/students')
+    app.register_blueprint(instructor_bp, url_prefix='/api/instructors')
+    app.register_blueprint(course_bp, url_prefix='/api/courses')
+
+    app.register_error_handler(PaginationError, handle_bad_query)
+    app.register_error_handler(FieldsError, handle_bad_query)
+    app.register_error_handler(SearchError, handle_bad_query)
+    app.register_error_handler(PasswordServiceBusy, handle_password_service_busy)
+    app.register_error_handler(RateLimited, handle_rate_limited)
+
+    register_commands(app)
+    return app
+
+
+_app = None
+
+
+def __getattr__(name):
+    # ``app:app`` (gunicorn) and ``from app import app`` still work; the
+    # default app is only built when something actually asks for it.
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == '__main__':
     port = int(os.environ.get("PORT", 5000))
-    app.run(debug=True, host='0.0.0.0', port=port)
\ No newline at end of file
+    create_app().run(debug=True, host='0.0.0.0', port=port)
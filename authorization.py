@@ -0,0 +1,77 @@
+from functools import wraps
+from flask import g, jsonify
+from flask_jwt_extended import jwt_required, get_jwt, get_jwt_identity
+from extensions import db
+from models import User, Instructor
+
+ROLE_ERRORS = {
+    'admin': 'Unauthorized: Admin access required',
+    'instructor': 'Unauthorized: Instructor access required',
+    'student': 'Unauthorized: Student access required',
+}
+
+
+def user_role(user):
+    return 'admin' if user.is_admin else 'instructor' if user.is_instructor else 'student'
+
+
+def identity_claims(user, instructor=None):
+    """Claims embedded in the access token so handlers can authorize without a query."""
+    if user.is_instructor and instructor is None:
+        instructor = user.instructor
+    return {
+        'uid': user.id,
+        'role': user_role(user),
+        'verified': bool(instructor and instructor.is_instructor_verified) if user.is_instructor else True,
+    }
+
+
+def current_claims():
+    """Role claims for the current request, falling back to the database for tokens
+    issued before the claims existed."""
+    if 'identity_claims' not in g:
+        claims = get_jwt()
+        if 'role' in claims and 'uid' in claims:
+            g.identity_claims = {'uid': claims['uid'], 'role': claims['role'], 'verified': claims.get('verified', False)}
+        else:
+            user = current_user()
+            g.identity_claims = identity_claims(user) if user else None
+    return g.identity_claims
+
+
+def current_user_id():
+    claims = current_claims()
+    return claims['uid'] if claims else None
+
+
+def current_user():
+    """The User row for the token identity, loaded at most once per request."""
+    if 'identity_user' not in g:
+        g.identity_user = User.query.filter_by(username=get_jwt_identity()).first()
+    return g.identity_user
+
+
+def instructor_verified(user_id):
+    if 'instructor_verified' not in g:
+        instructor = db.session.get(Instructor, user_id)
+        g.instructor_verified = bool(instructor and instructor.is_instructor_verified)
+    return g.instructor_verified
+
+
+def require_role(*roles, verified=None, message=None):
+    def decorator(fn):
+        @wraps(fn)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            claims = current_claims()
+            allowed = claims is not None and claims['role'] in roles
+            if allowed and verified is not None and claims['verified'] != verified:
+                # Tokens minted before an admin approval still carry verified=False.
+                allowed = verified and claims['role'] == 'instructor' and instructor_verified(claims['uid'])
+            if not allowed:
+                if message:
+                    return jsonify({'message': message}), 403
+                return jsonify({'error': ROLE_ERRORS.get(roles[0], 'Unauthorized')}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
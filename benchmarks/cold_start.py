@@ -0,0 +1,89 @@
+"""Worker cold start: time from ``import app`` to the first response.
+
+Each run is a fresh interpreter that imports the app module, builds the app
+with ``create_app`` and serves one authenticated ``GET /api/courses``.
+``--eager`` also runs ``init-db`` and ``seed`` before the first request,
+which is the work every import used to do.
+
+    python -m benchmarks.cold_start [--runs N] [--rounds N] [--eager]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from benchmarks.common import make_app, seed
+from extensions import db
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import json, os, sys, time
+start = time.perf_counter()
+import app as app_module
+from config import Config
+imported = time.perf_counter()
+
+class BenchConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ['COLD_START_DATABASE_URL']
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    JWT_SECRET_KEY = 'benchmark-secret-key-of-sufficient-length'
+    SECRET_KEY = 'benchmark'
+    BCRYPT_LOG_ROUNDS = int(os.environ['COLD_START_ROUNDS'])
+    PASSWORD_HASH_WORKERS = 0
+    DEBUG = False
+
+app = app_module.create_app(BenchConfig)
+created = time.perf_counter()
+if os.environ.get('COLD_START_EAGER'):
+    runner = app.test_cli_runner()
+    runner.invoke(args=['init-db'])
+    runner.invoke(args=['seed'])
+prepared = time.perf_counter()
+
+from flask_jwt_extended import create_access_token
+with app.app_context():
+    token = create_access_token(identity='admin', additional_claims={'uid': 1, 'role': 'admin', 'verified': False})
+response = app.test_client().get('/api/courses', headers={'Authorization': f'Bearer {token}'})
+assert response.status_code == 200, response.get_data(as_text=True)
+done = time.perf_counter()
+json.dump({'import': imported - start, 'create_app': created - imported,
+           'startup_work': prepared - created, 'first_response': done - prepared, 'total': done - start}, sys.stdout)
+'''
+
+
+def run_child(database_uri, args):
+    env = dict(os.environ, COLD_START_DATABASE_URL=database_uri, COLD_START_ROUNDS=str(args.rounds))
+    if args.eager:
+        env['COLD_START_EAGER'] = '1'
+    result = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--eager', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f'sqlite:///{tmp}/bench.db'
+        app = make_app(database_uri)
+        with app.app_context():
+            db.create_all()
+            seed(students=50, courses=20)
+            db.session.remove()
+        runs = [run_child(database_uri, args) for _ in range(args.runs)]
+
+    print(f"{'phase':<16}{'median ms':>12}{'max ms':>12}")
+    for phase in ('import', 'create_app', 'startup_work', 'first_response', 'total'):
+        samples = [r[phase] * 1000 for r in runs]
+        print(f'{phase:<16}{statistics.median(samples):>12.1f}{max(samples):>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
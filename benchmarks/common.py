@@ -0,0 +1,43 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+from extensions import db
+from seeding import GRADE_LETTERS, seed_population
+
+
+def make_app(database_uri=None):
+    """Bare Flask app bound to a benchmark database (in-memory SQLite by default)."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri or os.getenv('BENCH_DATABASE_URL', 'sqlite://')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(students=200, instructors=10, courses=50, enrollments_per_student=5, password=b'x'):
+    """Insert a synthetic population (see seeding.seed_population) and commit; returns the id lists."""
+    ids = seed_population(db.session.connection(), password, students=students, instructors=instructors,
+                          courses=courses, enrollments_per_student=enrollments_per_student)
+    db.session.commit()
+    return {key: list(ids[key]) for key in ('students', 'instructors', 'courses')}
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
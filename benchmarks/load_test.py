@@ -0,0 +1,367 @@
+"""Load test every API route against a seeded database.
+
+Builds the full app with ``create_app``, seeds a synthetic population
+(SQLite in a temporary directory unless ``--database-url`` points at a
+Postgres database), mints a token per role and serves the app on a local
+threaded server. Each route is then driven by ``--clients`` concurrent
+clients for ``--seconds``, reads first and deletes last, and the report
+lists throughput, p50/p95/p99 latency, error responses and SQL statements
+per request (counted server side and returned in ``X-Bench-Statements``).
+
+    python -m benchmarks.load_test [--seconds N] [--clients N] [--routes 'admin.*']
+                                   [--output run.json] [--baseline base.json]
+
+With ``--baseline``, routes whose p95 grew by more than ``--tolerance``
+percent, or which now run more SQL per request (beyond ``SQL_SLACK``), are listed and the exit
+status is 1. Image uploads are left out: they would measure the storage
+backend rather than the API.
+"""
+import argparse
+import fnmatch
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, namedtuple
+from datetime import datetime
+from flask import g, has_app_context
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select, update
+from werkzeug.serving import make_server
+from benchmarks.common import GRADE_LETTERS, seed
+from extensions import db, password_hasher
+from grade_stats import rebuild_course_stats
+from models import Course, Grade
+from transcripts import backfill_transcripts
+
+Route = namedtuple('Route', 'name role method make')
+
+SEARCH_TERMS = ['course', 'module', 'lesson text', 'cours', 'modle', 'course 1']
+# Cached routes run a varying number of statements depending on the hit rate.
+SQL_SLACK = 0.5
+
+
+class Pool:
+    """Ids handed out once each, for routes that consume what they touch (deletes, assignments)."""
+
+    def __init__(self, ids):
+        self._ids = list(ids)
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            return self._ids.pop() if self._ids else None
+
+
+def bench_config(database_uri, rounds, storage_root):
+    from config import Config
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = database_uri
+        JWT_SECRET_KEY = 'benchmark-secret-key-of-sufficient-length'
+        SECRET_KEY = 'benchmark'
+        BCRYPT_LOG_ROUNDS = rounds
+        PASSWORD_HASH_WORKERS = 0
+        RATELIMIT_ENABLED = False
+        STORAGE_BACKEND = 'local'
+        STORAGE_LOCAL_ROOT = storage_root
+        DEBUG = False
+
+    if not database_uri.startswith('postgresql'):
+        BenchConfig.SQLALCHEMY_ENGINE_OPTIONS = {}
+    return BenchConfig
+
+
+def count_statements(app):
+    """Report the SQL statements each request ran in an X-Bench-Statements header."""
+    def count(*args):
+        if has_app_context():
+            g.bench_statements = g.get('bench_statements', 0) + 1
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+
+    @app.after_request
+    def add_header(response):
+        response.headers['X-Bench-Statements'] = str(g.get('bench_statements', 0))
+        return response
+
+
+def prepare(app, args):
+    """Seed the database and collect the ids and tokens the routes need."""
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        ids = seed(students=args.students, instructors=args.instructors, courses=args.courses,
+                   enrollments_per_student=args.enrollments, password=password_hasher.hash('password'))
+        instructor = ids['instructors'][0]
+        # Every fifth course starts without an instructor so assign-course has something to claim.
+        unassigned = ids['courses'][4::5]
+        db.session.execute(update(Course).where(Course.id.in_(unassigned)).values(instructor_id=None))
+        db.session.commit()
+        rebuild_course_stats()
+        backfill_transcripts()
+        own_courses = db.session.execute(
+            select(Course.id).where(Course.instructor_id == instructor)).scalars().all()
+        grades = db.session.execute(select(Grade.id, Grade.course_id).order_by(Grade.id)).all()
+        own = set(own_courses)
+        own_grades = [gid for gid, cid in grades if cid in own]
+        other_grades = [gid for gid, cid in grades if cid not in own]
+        student = ids['students'][0]
+
+        def token(identity, uid, role):
+            return create_access_token(identity=identity, additional_claims={'uid': uid, 'role': role, 'verified': True})
+
+        def fresh_token(identity, uid, role):
+            with app.app_context():
+                return token(identity, uid, role)
+
+        state = {
+            'students': ids['students'],
+            'instructors': ids['instructors'],
+            'courses': [c for c in ids['courses'] if c not in unassigned],
+            'own_courses': own_courses,
+            'own_grades': own_grades[len(own_grades) // 2:],
+            'other_grades': other_grades[len(other_grades) // 2:],
+            'unique': itertools.count(),
+            'tokens': {
+                'admin': token('admin', 1, 'admin'),
+                'instructor': token(f'instructor{instructor}', instructor, 'instructor'),
+                'student': token(f'student{student}', student, 'student'),
+                'anonymous': None,
+                # Logging out revokes the token, so each request gets its own.
+                'logout': lambda: fresh_token(f'student{student}', student, 'student'),
+            },
+            # Consumed routes work on the first half; updates use the second half, so they never collide.
+            'delete_own_grades': Pool(own_grades[:len(own_grades) // 2]),
+            'delete_grades': Pool(other_grades[:len(other_grades) // 2]),
+            'delete_users': Pool(ids['students'][len(ids['students']) // 2:]),
+            'delete_courses': Pool(ids['courses'][len(ids['courses']) // 2:]),
+            'unassigned': Pool(unassigned),
+        }
+        db.session.remove()
+    return state
+
+
+def routes():
+    """Every blueprint route except image uploads, in the order they are run."""
+    def unique(s):
+        return next(s['unique'])
+
+    def grade_rows(s, rng, courses):
+        return {'grades': [{'student_id': rng.choice(s['students']), 'course_id': rng.choice(courses),
+                            'grade': rng.choice(GRADE_LETTERS)} for _ in range(20)]}
+
+    def take(pool, path):
+        def make(s, rng):
+            item = s[pool].take()
+            return (path.format(item), None) if item is not None else None
+        return make
+
+    return [
+        # Reads
+        Route('courses.list', 'student', 'GET', lambda s, r: ('/api/courses?limit=50', None)),
+        Route('courses.list_fields', 'student', 'GET', lambda s, r: ('/api/courses?limit=50&fields=id,name', None)),
+        Route('courses.get', 'student', 'GET', lambda s, r: (f"/api/courses/{r.choice(s['courses'])}", None)),
+        Route('courses.search', 'student', 'GET', lambda s, r: (f"/api/courses/search?q={r.choice(SEARCH_TERMS).replace(' ', '+')}", None)),
+        Route('admin.users.list', 'admin', 'GET', lambda s, r: ('/api/admin/users?limit=50', None)),
+        Route('admin.users.get', 'admin', 'GET', lambda s, r: (f"/api/admin/users/{r.choice(s['students'])}", None)),
+        Route('admin.courses.list', 'admin', 'GET', lambda s, r: ('/api/admin/courses?limit=50', None)),
+        Route('admin.courses.get', 'admin', 'GET', lambda s, r: (f"/api/admin/courses/{r.choice(s['courses'])}", None)),
+        Route('admin.courses.stats', 'admin', 'GET', lambda s, r: (f"/api/admin/courses/{r.choice(s['courses'])}/stats", None)),
+        Route('admin.instructors', 'admin', 'GET', lambda s, r: ('/api/admin/instructors', None)),
+        Route('admin.grades.list', 'admin', 'GET', lambda s, r: ('/api/admin/grades?limit=50', None)),
+        Route('admin.cache_stats', 'admin', 'GET', lambda s, r: ('/api/admin/cache-stats', None)),
+        Route('admin.db_pool', 'admin', 'GET', lambda s, r: ('/api/admin/db/pool', None)),
+        Route('instructor.courses', 'instructor', 'GET', lambda s, r: ('/api/instructors/courses', None)),
+        Route('instructor.my_courses', 'instructor', 'GET', lambda s, r: ('/api/instructors/my-courses', None)),
+        Route('instructor.course_students', 'instructor', 'GET', lambda s, r: (f"/api/instructors/courses/{r.choice(s['own_courses'])}/students", None)),
+        Route('instructor.course_stats', 'instructor', 'GET', lambda s, r: (f"/api/instructors/courses/{r.choice(s['own_courses'])}/stats", None)),
+        Route('instructor.grades.list', 'instructor', 'GET', lambda s, r: ('/api/instructors/grades', None)),
+        Route('student.my_grades', 'student', 'GET', lambda s, r: ('/api/students/my-grades', None)),
+        Route('student.transcript', 'student', 'GET', lambda s, r: ('/api/students/transcript', None)),
+        Route('student.my_courses', 'student', 'GET', lambda s, r: ('/api/students/my-courses', None)),
+        # Auth
+        Route('auth.login', 'anonymous', 'POST', lambda s, r: ('/api/auth/login', {'username': 'admin', 'password': 'password'})),
+        Route('auth.signup', 'anonymous', 'POST', lambda s, r: ('/api/auth/signup', {'username': f'signup{unique(s)}', 'email': f'signup{unique(s)}@example.com', 'password': 'password'})),
+        Route('auth.logout', 'logout', 'POST', lambda s, r: ('/api/auth/logout', None)),
+        # Writes
+        Route('admin.users.create', 'admin', 'POST', lambda s, r: ('/api/admin/users', {'username': f'created{unique(s)}', 'email': f'created{unique(s)}@example.com', 'password': 'password'})),
+        Route('admin.users.update', 'admin', 'PUT', lambda s, r: (f"/api/admin/users/{r.choice(s['students'][:len(s['students']) // 2])}", {'email': f'updated{unique(s)}@example.com'})),
+        Route('admin.users.approve', 'admin', 'PUT', lambda s, r: (f"/api/admin/users/{r.choice(s['instructors'])}/approve-instructor", None)),
+        Route('admin.courses.create', 'admin', 'POST', lambda s, r: ('/api/admin/courses', {'name': f'Bench course {unique(s)}', 'duration': r.randint(1, 12), 'modules': [{'title': 'Intro', 'content': 'Lesson text'}]})),
+        Route('admin.courses.update', 'admin', 'PUT', lambda s, r: (f"/api/admin/courses/{r.choice(s['courses'][:len(s['courses']) // 2])}", {'duration': r.randint(1, 12)})),
+        Route('admin.grades.create', 'admin', 'POST', lambda s, r: ('/api/admin/grades', {'student_id': r.choice(s['students']), 'course_id': r.choice(s['courses']), 'grade': r.choice(GRADE_LETTERS)})),
+        Route('admin.grades.bulk', 'admin', 'POST', lambda s, r: ('/api/admin/grades/bulk', grade_rows(s, r, s['courses']))),
+        Route('admin.grades.update', 'admin', 'PUT', lambda s, r: (f"/api/admin/grades/{r.choice(s['other_grades'])}", {'grade': r.choice(GRADE_LETTERS)})),
+        Route('admin.enrollments', 'admin', 'POST', lambda s, r: ('/api/admin/enrollments', {'student_ids': r.sample(s['students'], 5), 'course_ids': r.sample(s['courses'], 2)})),
+        Route('instructor.courses.create', 'instructor', 'POST', lambda s, r: ('/api/instructors/courses', {'name': f'Instructor course {unique(s)}', 'duration': r.randint(1, 12)})),
+        Route('instructor.courses.update', 'instructor', 'PUT', lambda s, r: (f"/api/instructors/courses/{r.choice(s['own_courses'])}", {'duration': r.randint(1, 12)})),
+        Route('instructor.grades.create', 'instructor', 'POST', lambda s, r: ('/api/instructors/grades', {'student_id': r.choice(s['students']), 'course_id': r.choice(s['own_courses']), 'grade': r.choice(GRADE_LETTERS)})),
+        Route('instructor.grades.bulk', 'instructor', 'POST', lambda s, r: ('/api/instructors/grades/bulk', grade_rows(s, r, s['own_courses']))),
+        Route('instructor.grades.update', 'instructor', 'PUT', lambda s, r: (f"/api/instructors/grades/{r.choice(s['own_grades'])}", {'grade': r.choice(GRADE_LETTERS)})),
+        Route('instructor.assign_course', 'instructor', 'POST', lambda s, r: (lambda c: ('/api/instructors/assign-course', {'course_id': c}) if c else None)(s['unassigned'].take())),
+        Route('student.enroll', 'student', 'POST', lambda s, r: ('/api/students/enroll', {'course_id': r.choice(s['courses'])})),
+        Route('student.enroll_bulk', 'student', 'POST', lambda s, r: ('/api/students/enroll/bulk', {'course_ids': r.sample(s['courses'], 3)})),
+        # Deletes
+        Route('instructor.grades.delete', 'instructor', 'DELETE', take('delete_own_grades', '/api/instructors/grades/{}')),
+        Route('admin.grades.delete', 'admin', 'DELETE', take('delete_grades', '/api/admin/grades/{}')),
+        Route('admin.users.delete', 'admin', 'DELETE', take('delete_users', '/api/admin/users/{}')),
+        Route('admin.courses.delete', 'admin', 'DELETE', take('delete_courses', '/api/admin/courses/{}')),
+    ]
+
+
+def send(base, method, path, body, token):
+    headers = {'Content-Type': 'application/json', 'Accept-Encoding': 'gzip'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base + path, data=data, headers=headers, method=method)
+    try:
+        with urllib.request.urlopen(req) as response:
+            response.read()
+            return response.status, response.headers
+    except urllib.error.HTTPError as e:
+        e.read()
+        return e.code, e.headers
+
+
+def percentile(quantiles, p):
+    return quantiles[p - 1] * 1000 if quantiles else None
+
+
+def drive(base, route, state, args):
+    """Run one route with ``args.clients`` threads for ``args.seconds``; returns its summary."""
+    latencies, statements, statuses = [], [], Counter()
+    lock = threading.Lock()
+    stop = time.monotonic() + args.seconds
+
+    def client(seed_value):
+        rng = random.Random(seed_value)
+        token = state['tokens'][route.role]
+        while time.monotonic() < stop:
+            target = route.make(state, rng)
+            if target is None:  # pool exhausted
+                return
+            bearer = token() if callable(token) else token
+            start = time.perf_counter()
+            status, headers = send(base, route.method, target[0], target[1], bearer)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[status] += 1
+                statements.append(int(headers.get('X-Bench-Statements', 0)))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(args.clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - started
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else []
+    return {
+        'method': route.method,
+        'role': route.role,
+        'requests': len(latencies),
+        'errors': sum(n for status, n in statuses.items() if status >= 400),
+        'statuses': {str(status): n for status, n in sorted(statuses.items())},
+        'throughput': round(len(latencies) / duration, 1),
+        'p50_ms': percentile(quantiles, 50),
+        'p95_ms': percentile(quantiles, 95),
+        'p99_ms': percentile(quantiles, 99),
+        'sql_per_request': round(statistics.mean(statements), 2) if statements else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Routes that got slower or chattier than ``baseline``, as printable lines."""
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get('routes', {}).get(name)
+        if not before or not current['requests'] or not before.get('requests'):
+            continue
+        # A route that ran a single request (a drained pool) has no percentiles.
+        if before['p95_ms'] and current['p95_ms'] is not None and current['p95_ms'] > before['p95_ms'] * (1 + tolerance / 100):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.1f} -> {current['p95_ms']:.1f} ms")
+        if before['sql_per_request'] is not None and current['sql_per_request'] > before['sql_per_request'] + SQL_SLACK:
+            regressions.append(f"{name}: SQL/request {before['sql_per_request']} -> {current['sql_per_request']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--routes', default='*', help='comma-separated name patterns, e.g. "courses.*,admin.grades.*"')
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--instructors', type=int, default=20)
+    parser.add_argument('--courses', type=int, default=200)
+    parser.add_argument('--enrollments', type=int, default=5, help='enrollments per student')
+    parser.add_argument('--rounds', type=int, default=4, help='bcrypt rounds for seeded and new passwords')
+    parser.add_argument('--database-url', default=os.getenv('BENCH_DATABASE_URL'),
+                        help='an empty database to seed (default: SQLite in a temporary directory)')
+    parser.add_argument('--reset', action='store_true', help='drop all tables in --database-url first')
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='a previous --output file to compare against')
+    parser.add_argument('--tolerance', type=float, default=20, help='allowed p95 growth over the baseline, in percent')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    from app import create_app
+    started = datetime.utcnow()
+    patterns = [p.strip() for p in args.routes.split(',') if p.strip()]
+    selected = [r for r in routes() if any(fnmatch.fnmatch(r.name, p) for p in patterns)]
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = args.database_url or f'sqlite:///{tmp}/bench.db'
+        app = create_app(bench_config(database_uri, args.rounds, os.path.join(tmp, 'media')))
+        logging.getLogger().setLevel(logging.WARNING)
+        count_statements(app)
+        state = prepare(app, args)
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f'http://127.0.0.1:{server.server_port}'
+
+        results = {}
+        print(f"{'route':<30}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'SQL/req':>9}{'errors':>8}")
+        for route in selected:
+            summary = results[route.name] = drive(base, route, state, args)
+            fmt = lambda v: f'{v:>9.1f}' if v is not None else f"{'-':>9}"
+            print(f"{route.name:<30}{summary['throughput']:>9.1f}{fmt(summary['p50_ms'])}{fmt(summary['p95_ms'])}"
+                  f"{fmt(summary['p99_ms'])}{fmt(summary['sql_per_request'])}{summary['errors']:>8}")
+        server.shutdown()
+
+    report = {
+        'meta': {
+            'started': started.isoformat(),
+            'database': database_uri.split(':', 1)[0],
+            'python': platform.python_version(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline', 'database_url')},
+        },
+        'routes': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
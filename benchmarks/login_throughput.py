@@ -0,0 +1,112 @@
+"""Login throughput while catalog requests run concurrently.
+
+Runs the auth and catalog routes on a local threaded server, then drives
+logins and catalog reads in parallel threads, once with bcrypt inline on the
+request thread and once through the password worker pool.
+
+    python -m benchmarks.login_throughput [--seconds N] [--login-clients N] [--catalog-clients N]
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from werkzeug.serving import make_server
+from benchmarks.common import make_app, seed
+from extensions import db, jwt, password_hasher
+from cache import catalog_cache
+
+
+def build_app(database_uri, workers, rounds):
+    from routes.auth_route import auth_bp
+    from routes.instructor_route import instructor_bp
+    app = make_app(database_uri)
+    app.config.update(JWT_SECRET_KEY='benchmark-secret-key-of-sufficient-length', BCRYPT_LOG_ROUNDS=rounds,
+                      PASSWORD_HASH_WORKERS=workers, PASSWORD_HASH_QUEUE_DEPTH=256, CATALOG_CACHE_TTL=0)
+    jwt.init_app(app)
+    password_hasher.init_app(app)
+    catalog_cache.init_app(app)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(instructor_bp, url_prefix='/api/instructors')
+    return app
+
+
+def request(url, body=None, token=None):
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    data = json.dumps(body).encode() if body is not None else None
+    with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers)) as response:
+        return json.loads(response.read())
+
+
+def run(workers, args, database_uri):
+    app = build_app(database_uri, workers, args.rounds)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+    token = request(f'{base}/api/auth/login', {'username': 'admin', 'password': 'password'})['token']
+
+    stop = time.monotonic() + args.seconds
+    logins, catalog = [], []
+
+    def login_client():
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            try:
+                request(f'{base}/api/auth/login', {'username': 'admin', 'password': 'password'})
+                logins.append(time.perf_counter() - start)
+            except urllib.error.HTTPError:
+                pass
+
+    def catalog_client():
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            request(f'{base}/api/instructors/courses', token=token)
+            catalog.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=login_client) for _ in range(args.login_clients)]
+    threads += [threading.Thread(target=catalog_client) for _ in range(args.catalog_clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    server.shutdown()
+
+    def p95(samples):
+        return statistics.quantiles(samples, n=20)[-1] * 1000 if len(samples) > 1 else float('nan')
+
+    label = f'pool({workers})' if workers else 'inline'
+    print(f'{label:<10}{len(logins) / args.seconds:>12.1f}{p95(logins):>12.1f}'
+          f'{len(catalog) / args.seconds:>14.1f}{p95(catalog):>14.1f}')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--login-clients', type=int, default=8)
+    parser.add_argument('--catalog-clients', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_uri = f'sqlite:///{tmp}/bench.db'
+        app = build_app(database_uri, 0, args.rounds)
+        with app.app_context():
+            db.create_all()
+            seed(password=password_hasher.hash('password'))
+            db.session.remove()
+        print(f"{'mode':<10}{'logins/s':>12}{'p95 ms':>12}{'catalog/s':>14}{'p95 ms':>14}")
+        for workers in (0, args.workers):
+            run(workers, args, database_uri)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Query-plan regression check for the routes' main lookups.
+
+Seeds a database, runs EXPLAIN on the query behind each route and exits
+non-zero if any plan sequentially scans a table larger than --threshold
+rows. Works on SQLite (EXPLAIN QUERY PLAN) and Postgres (EXPLAIN FORMAT
+JSON); point BENCH_DATABASE_URL at an empty Postgres database to check the
+real planner.
+
+    python -m benchmarks.query_plans [--students N] [--threshold ROWS]
+"""
+import argparse
+import json
+import sys
+from sqlalchemy import func, select
+from benchmarks.common import make_app, seed
+from extensions import db
+from models import User, Course, Grade, student_course
+
+
+def route_queries(ids):
+    student_id = ids['students'][len(ids['students']) // 2]
+    instructor_id = ids['instructors'][0]
+    course_id = ids['courses'][len(ids['courses']) // 2]
+    page = ids['courses'][:50]
+    return {
+        'auth: user by username': select(User).where(User.username == f'student{student_id}'),
+        'students/my-grades': select(Grade).where(Grade.student_id == student_id),
+        'students/my-courses': select(Course).join(student_course).where(student_course.c.student_id == student_id),
+        'students/enroll: existing check': select(student_course).where(
+            student_course.c.student_id == student_id, student_course.c.course_id == course_id),
+        'instructors/my-courses': select(Course).where(Course.instructor_id == instructor_id),
+        'instructors/grades': select(Grade).join(Course).where(Course.instructor_id == instructor_id),
+        'instructors/courses/<id>/students': select(student_course.c.student_id).where(student_course.c.course_id == course_id),
+        'loader: course students': select(student_course).where(student_course.c.course_id.in_(page)),
+        'loader: course grades': select(Grade.course_id, Grade.id).where(Grade.course_id.in_(page)),
+    }
+
+
+def table_sizes():
+    tables = ['user', 'student', 'instructor', 'course', 'grade', 'student_course']
+    return {t: db.session.execute(select(func.count()).select_from(db.metadata.tables[t])).scalar() for t in tables}
+
+
+def sequential_scans(statement, sizes):
+    """Tables the plan scans sequentially, as (table, rows) pairs."""
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    scans = []
+    if dialect.name == 'postgresql':
+        plan = db.session.execute(db.text(f'EXPLAIN (FORMAT JSON) {sql}')).scalar()
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        nodes = [plan[0]['Plan']]
+        while nodes:
+            node = nodes.pop()
+            if node['Node Type'] == 'Seq Scan':
+                scans.append((node['Relation Name'], sizes.get(node['Relation Name'], 0)))
+            nodes.extend(node.get('Plans', []))
+    else:
+        for row in db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')):
+            detail = row[-1]
+            if detail.startswith('SCAN '):
+                table = detail.split()[1].strip('"')
+                scans.append((table, sizes.get(table, 0)))
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--courses', type=int, default=300)
+    parser.add_argument('--threshold', type=int, default=1000)
+    args = parser.parse_args()
+
+    app = make_app()
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        ids = seed(students=args.students, instructors=50, courses=args.courses)
+        if db.engine.dialect.name == 'postgresql':
+            db.session.execute(db.text('ANALYZE'))
+        sizes = table_sizes()
+        for name, statement in route_queries(ids).items():
+            offending = [(t, n) for t, n in sequential_scans(statement, sizes) if n > args.threshold]
+            status = 'FAIL' if offending else 'ok'
+            detail = ', '.join(f'seq scan on {t} ({n} rows)' for t, n in offending)
+            print(f'{status:<6}{name:<40}{detail}')
+            failures += bool(offending)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
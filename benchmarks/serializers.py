@@ -0,0 +1,79 @@
+"""Compare the read-path serializers the routes use with what they replaced.
+
+Courses are checked against the marshmallow schema dump; grade and user
+rows against the per-row lookups the list routes used to make.
+
+    python -m benchmarks.serializers [--courses N] [--repeat N]
+"""
+import argparse
+from benchmarks.common import make_app, seed, StatementCounter, timed
+from extensions import db
+from models import Course, Grade, Instructor, User
+from schemas import CourseSchema
+from schemas.serializers import dump_courses, grade_summary, prime_grade_courses, prime_user_instructors, user_summary
+
+
+def per_row_grades(grades):
+    return [{'id': g.id, 'student_id': g.student_id, 'course_id': g.course_id, 'grade': g.grade,
+             'course': {'name': g.course.name} if g.course else None} for g in grades]
+
+
+def batched_grades(grades):
+    prime_grade_courses(grades)
+    return [grade_summary(g) for g in grades]
+
+
+def per_row_users(users):
+    def verified(user):
+        instructor = Instructor.query.filter_by(id=user.id).first() if user.is_instructor else None
+        return bool(instructor and instructor.is_instructor_verified)
+    return [{'id': u.id, 'username': u.username, 'email': u.email,
+             'role': 'instructor' if u.is_instructor else 'student' if u.is_student else 'admin',
+             'is_instructor_verified': verified(u)} for u in users]
+
+
+def batched_users(users):
+    prime_user_instructors(users)
+    return [user_summary(u) for u in users]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--courses', type=int, default=50)
+    parser.add_argument('--students', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    app = make_app()
+    with app.app_context():
+        db.create_all()
+        seed(students=args.students, courses=args.courses)
+        counter = StatementCounter(db.engine)
+
+    cases = [
+        ('course', Course, CourseSchema(many=True).dump, dump_courses),
+        ('grade', Grade, per_row_grades, batched_grades),
+        ('user', User, per_row_users, batched_users),
+    ]
+    print(f"{'model':<8}{'rows':>7}{'before ms':>16}{'stmts':>7}{'fast ms':>10}{'stmts':>7}{'speedup':>9}")
+    for name, model, schema_dump, fast_dump in cases:
+        results = {}
+        for label, dump in (('schema', schema_dump), ('fast', fast_dump)):
+            def run():
+                # A fresh app context per call, like a request: no loader or identity-map carry-over.
+                with app.app_context():
+                    rows = model.query.order_by(model.id).all()
+                    results[label] = dump(rows)
+                    db.session.remove()
+            run()
+            counter.count = 0
+            elapsed = timed(run, args.repeat)
+            results[label + '_stmts'] = counter.count / args.repeat
+            results[label + '_ms'] = elapsed * 1000
+        assert results['schema'] == results['fast'], f'{name} serializers disagree'
+        print(f"{name:<8}{len(results['fast']):>7}{results['schema_ms']:>16.2f}{results['schema_stmts']:>7.0f}"
+              f"{results['fast_ms']:>10.2f}{results['fast_stmts']:>7.0f}{results['schema_ms'] / results['fast_ms']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from compression import Precompressed
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize=256, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def get_variant(self, key, variant):
+        """Look up one variant of an entry whose value is a dict of variants.
+
+        Returns ``(value, variants)``. A missing or expired entry is replaced
+        by an empty dict, and a missing variant counts as a miss; fill it in
+        with set_variant() on the returned ``variants``. If the entry is
+        deleted in the meantime that dict is detached, so a value built from
+        stale data is not served.
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                entry = self._data[key] = (now + self.ttl, {})
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+            self._data.move_to_end(key)
+            value = entry[1].get(variant)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value, entry[1]
+
+    def set_variant(self, variants, variant, value):
+        with self._lock:
+            variants[variant] = value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class CatalogCache:
+    """Serialized course catalog pages and single-course payloads.
+
+    Values are the encoded response bodies, so a hit skips the query, the
+    schema dump and the JSON encoding. Every Course write path (and every
+    enrollment or grade write, since course payloads list student and grade
+    ids) must call invalidate(). The cache is per process: other workers
+    pick up a change when their entry's TTL runs out.
+    """
+
+    def __init__(self):
+        self.pages = TTLCache()
+        self.courses = TTLCache()
+
+    def init_app(self, app):
+        for cache in (self.pages, self.courses):
+            cache.maxsize = app.config.get('CATALOG_CACHE_SIZE', 256)
+            cache.ttl = app.config.get('CATALOG_CACHE_TTL', 60)
+
+    def page(self, key, build):
+        """Cached (body, next_cursor) for a catalog page; ``build`` produces it on a miss."""
+        entry = self.pages.get(key)
+        if entry is None:
+            entry = build()
+            self.pages.set(key, entry)
+        return entry
+
+    def course(self, course_id, build, variant=None):
+        """Cached body for one course; ``variant`` tells apart e.g. different ?fields= projections."""
+        body, variants = self.courses.get_variant(course_id, variant)
+        if body is None:
+            body = build()
+            self.courses.set_variant(variants, variant, body)
+        return body
+
+    def invalidate(self, *course_ids):
+        for course_id in course_ids:
+            self.courses.delete(course_id)
+        self.pages.clear()
+
+    def stats(self):
+        return {'pages': self.pages.stats(), 'courses': self.courses.stats()}
+
+
+def json_body(data):
+    """Encode ``data`` exactly as jsonify() would, ready to be served compressed."""
+    return Precompressed(current_app.json.response(data).get_data())
+
+
+catalog_cache = CatalogCache()
@@ -0,0 +1,132 @@
+import time
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select, text
+from extensions import db, password_hasher
+from models import User
+from authorization import user_role
+from seeding import is_empty, seed_population, truncate_tables
+from grade_stats import rebuild_course_stats
+from transcripts import backfill_transcripts
+from search import create_search_schema
+
+DEFAULT_USERS = [
+    {'username': 'admin', 'email': 'admin@example.com', 'password': 'admin123',
+     'is_admin': True, 'is_instructor': False, 'is_student': False},
+    {'username': 'instructor1', 'email': 'instructor1@example.com', 'password': 'instructor123',
+     'is_admin': False, 'is_instructor': True, 'is_student': False},
+]
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create any missing tables and check the database connection."""
+    db.create_all()
+    create_search_schema(db.session.connection())
+    db.session.execute(text('SELECT 1'))
+    db.session.commit()
+    click.echo("Database connection successful and tables created!")
+
+
+@click.command('seed')
+@with_appcontext
+def seed_command():
+    """Create the default admin and instructor1 accounts if they don't exist."""
+    for fields in DEFAULT_USERS:
+        if User.query.filter_by(username=fields['username']).first():
+            continue
+        fields = dict(fields, password=password_hasher.hash(fields['password']))
+        db.session.add(User(**fields))
+        db.session.commit()
+        click.echo(f"{fields['username']} user seeded")
+
+
+@click.command('rebuild-grade-stats')
+@with_appcontext
+def rebuild_grade_stats_command():
+    """Recount course_grade_count from the grade table."""
+    rows = rebuild_course_stats()
+    click.echo(f"Rebuilt grade statistics ({rows} course/grade rows)")
+
+
+@click.command('backfill-transcripts')
+@with_appcontext
+def backfill_transcripts_command():
+    """Build the stored transcript of every student."""
+    written = backfill_transcripts()
+    click.echo(f"Built {written} transcripts")
+
+
+@click.command('seed-bulk')
+@click.option('--students', default=10000, show_default=True)
+@click.option('--instructors', default=100, show_default=True)
+@click.option('--courses', default=500, show_default=True)
+@click.option('--enrollments', default=5, show_default=True, help='Courses per student, each with a grade.')
+@click.option('--password', default='password', show_default=True, help='Shared by every seeded account.')
+@click.option('--batch-size', default=10000, show_default=True)
+@click.option('--truncate', is_flag=True, help='Empty every table first.')
+@click.option('--skip-derived', is_flag=True, help="Don't rebuild grade statistics and transcripts.")
+@with_appcontext
+def seed_bulk_command(students, instructors, courses, enrollments, password, batch_size, truncate, skip_derived):
+    """Load a synthetic population of users, courses, enrollments and grades."""
+    start = time.perf_counter()
+    connection = db.session.connection()
+    if truncate:
+        truncate_tables(connection)
+    elif not is_empty(connection):
+        raise click.UsageError('The database already has users; pass --truncate to replace them.')
+    # One bcrypt hash, shared by every account.
+    password_hash = password_hasher.hash(password)
+    result = seed_population(connection, password_hash, students=students, instructors=instructors,
+                             courses=courses, enrollments_per_student=enrollments, batch_size=batch_size)
+    db.session.commit()
+    rows = sum(result['rows'].values())
+    click.echo(', '.join(f'{count} {table}' for table, count in result['rows'].items()))
+    if not skip_derived:
+        rebuild_course_stats()
+        backfill_transcripts()
+    elapsed = time.perf_counter() - start
+    click.echo(f"Seeded {rows} rows in {elapsed:.1f}s ({rows / elapsed:.0f} rows/s)")
+
+
+@click.command('truncate-all')
+@click.confirmation_option(prompt='Delete every row in every table?')
+@with_appcontext
+def truncate_all_command():
+    """Empty every table and restart the id sequences."""
+    truncate_tables(db.session.connection())
+    db.session.commit()
+    click.echo("All tables truncated")
+
+
+@click.command('list-users')
+@click.option('--role', type=click.Choice(['admin', 'instructor', 'student']))
+@click.option('--limit', type=int)
+@with_appcontext
+def list_users_command(role, limit):
+    """Print users as tab-separated id, username, email and role, streamed from the database."""
+    query = select(User.id, User.username, User.email, User.is_admin, User.is_instructor).order_by(User.id)
+    if role == 'admin':
+        query = query.where(User.is_admin.is_(True))
+    elif role == 'instructor':
+        query = query.where(User.is_instructor.is_(True))
+    elif role == 'student':
+        query = query.where(User.is_admin.isnot(True), User.is_instructor.isnot(True))
+    if limit is not None:
+        query = query.limit(limit)
+    total = 0
+    for user in db.session.execute(query.execution_options(yield_per=1000)):
+        click.echo(f"{user.id}\t{user.username}\t{user.email}\t{user_role(user)}")
+        total += 1
+    click.echo(f"{total} users", err=True)
+
+
+def register_commands(app):
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(seed_command)
+    app.cli.add_command(rebuild_grade_stats_command)
+    app.cli.add_command(backfill_transcripts_command)
+    app.cli.add_command(seed_bulk_command)
+    app.cli.add_command(truncate_all_command)
+    app.cli.add_command(list_users_command)
@@ -0,0 +1,133 @@
+"""Negotiated gzip / brotli response compression.
+
+Brotli is used when the ``brotli`` package is installed and the client
+asks for it; otherwise gzip. Bodies below ``COMPRESS_MIN_SIZE`` are sent
+as they are. Streamed responses are compressed on the fly and flushed
+every ``COMPRESS_STREAM_FLUSH_BYTES`` of input so rows keep arriving
+progressively. Cached payloads are wrapped in ``Precompressed``, which
+keeps each encoding it has produced next to the raw bytes, so a cached
+catalog page is compressed once per encoding rather than once per request.
+"""
+import gzip
+import zlib
+from flask import Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+COMPRESSIBLE = ('application/json', 'text/html', 'text/plain', 'text/csv', 'text/css', 'application/javascript')
+
+
+def _gzip(data, settings):
+    return gzip.compress(data, compresslevel=settings['gzip_level'], mtime=0)
+
+
+def _brotli(data, settings):
+    return brotli.compress(data, quality=settings['brotli_quality'])
+
+
+ENCODERS = {'gzip': _gzip}
+if brotli is not None:
+    ENCODERS['br'] = _brotli
+
+
+class Precompressed:
+    """An encoded response body plus the compressed variants made from it so far."""
+    __slots__ = ('raw', 'variants')
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.variants = {}
+
+    def encoded(self, encoding, settings):
+        body = self.variants.get(encoding)
+        if body is None:
+            body = self.variants[encoding] = ENCODERS[encoding](self.raw, settings)
+        return body
+
+    def __len__(self):
+        return len(self.raw)
+
+
+def payload_response(body, status=200, mimetype='application/json'):
+    """Response for raw bytes or a Precompressed cache entry."""
+    if isinstance(body, Precompressed):
+        response = Response(body.raw, status=status, mimetype=mimetype)
+        response.precompressed = body
+        return response
+    return Response(body, status=status, mimetype=mimetype)
+
+
+def _settings():
+    config = current_app.config
+    return {
+        'min_size': config.get('COMPRESS_MIN_SIZE', 500),
+        'gzip_level': config.get('COMPRESS_GZIP_LEVEL', 6),
+        'brotli_quality': config.get('COMPRESS_BROTLI_QUALITY', 5),
+        'flush_bytes': config.get('COMPRESS_STREAM_FLUSH_BYTES', 64 * 1024),
+    }
+
+
+def _stream(iterable, encoding, settings):
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=settings['brotli_quality'])
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(settings['gzip_level'], zlib.DEFLATED, 31)
+        compress = compressor.compress
+        flush = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+        finish = compressor.flush
+    pending = 0
+    try:
+        for chunk in iterable:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            out = compress(chunk)
+            pending += len(chunk)
+            if pending >= settings['flush_bytes']:
+                out += flush()
+                pending = 0
+            if out:
+                yield out
+        yield finish()
+    finally:
+        if hasattr(iterable, 'close'):
+            iterable.close()
+
+
+def _compress_response(response):
+    if response.mimetype not in COMPRESSIBLE:
+        return response
+    response.vary.add('Accept-Encoding')
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers or response.direct_passthrough
+            or request.method == 'HEAD'):
+        return response
+    encoding = request.accept_encodings.best_match(list(ENCODERS))
+    if encoding is None:
+        return response
+    settings = _settings()
+
+    if response.is_streamed:
+        response.response = _stream(response.response, encoding, settings)
+        response.headers.pop('Content-Length', None)
+    else:
+        precompressed = getattr(response, 'precompressed', None)
+        if precompressed is not None:
+            if len(precompressed) < settings['min_size']:
+                return response
+            body = precompressed.encoded(encoding, settings)
+        else:
+            data = response.get_data()
+            if len(data) < settings['min_size']:
+                return response
+            body = ENCODERS[encoding](data, settings)
+        response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    app.after_request(_compress_response)
@@ -1,26 +1,35 @@
 from dotenv import load_dotenv
 import os
 import logging
+from db_pool import InstrumentedQueuePool
 
 
-logging.basicConfig(level=logging.INFO)
-
 load_dotenv()
 
 
-logging.info(f"DB_USER: {os.getenv('DB_USER')}")
-logging.info(f"DB_PASSWORD: {os.getenv('DB_PASSWORD')}")
-logging.info(f"DB_HOST: {os.getenv('DB_HOST')}")
-logging.info(f"DB_PORT: {os.getenv('DB_PORT')}")
-logging.info(f"DB_NAME: {os.getenv('DB_NAME')}")
-logging.info(f"SECRET_KEY: {os.getenv('SECRET_KEY')}")
-logging.info(f"JWT_SECRET_KEY: {os.getenv('JWT_SECRET_KEY')}")
+REQUIRED_VARS = ['DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT', 'DB_NAME', 'SECRET_KEY', 'JWT_SECRET_KEY']
+
+
+def check_environment():
+    """Fail fast at app creation when the deployment is missing settings."""
+    missing_vars = [var for var in REQUIRED_VARS if not os.getenv(var)]
+    if missing_vars:
+        raise ValueError(f"Missing environment variables: {', '.join(missing_vars)}")
+    logging.getLogger(__name__).info("Database host: %s:%s/%s", os.getenv('DB_HOST'), os.getenv('DB_PORT'), os.getenv('DB_NAME'))
 
 
-required_vars = ['DB_USER', 'DB_PASSWORD', 'DB_HOST', 'DB_PORT', 'DB_NAME', 'SECRET_KEY', 'JWT_SECRET_KEY']
-missing_vars = [var for var in required_vars if not os.getenv(var)]
-if missing_vars:
-    raise ValueError(f"Missing environment variables: {', '.join(missing_vars)}")
+def engine_options(pool_size=5, max_overflow=10, pool_recycle=1800, pool_timeout=30, statement_timeout_ms=30000):
+    """SQLAlchemy pool settings; each default can be overridden from the environment."""
+    statement_timeout_ms = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', statement_timeout_ms))
+    return {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', pool_recycle)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', pool_timeout)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes'),
+        'connect_args': {'options': f'-c statement_timeout={statement_timeout_ms}'},
+    }
 
 
 class Config:
@@ -31,7 +40,40 @@ class Config:
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     CORS_RESOURCES = {r"/api/*": {"origins": CORS_ORIGINS}}
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options()
     SECRET_KEY = os.getenv('SECRET_KEY')
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')
     JWT_ACCESS_TOKEN_EXPIRES = 3600 
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 50))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 200))
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 500))
+    CATALOG_CACHE_SIZE = int(os.getenv('CATALOG_CACHE_SIZE', 256))
+    CATALOG_CACHE_TTL = int(os.getenv('CATALOG_CACHE_TTL', 60))
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv('PASSWORD_HASH_QUEUE_DEPTH', 16))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    GRADE_IMPORT_MAX_ROWS = int(os.getenv('GRADE_IMPORT_MAX_ROWS', 10000))
+    ENROLLMENT_BULK_MAX_PAIRS = int(os.getenv('ENROLLMENT_BULK_MAX_PAIRS', 50000))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    SUPABASE_URL = os.getenv('SUPABASE_URL')
+    SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY')
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'supabase')
+    STORAGE_BUCKET = os.getenv('STORAGE_BUCKET', 'course_images')
+    STORAGE_LOCAL_ROOT = os.getenv('STORAGE_LOCAL_ROOT')
+    STORAGE_LOCAL_URL = os.getenv('STORAGE_LOCAL_URL', '/media')
+    STORAGE_UPLOAD_WORKERS = int(os.getenv('STORAGE_UPLOAD_WORKERS', 2))
+    MAX_IMAGE_UPLOAD_BYTES = int(os.getenv('MAX_IMAGE_UPLOAD_BYTES', 5 * 1024 * 1024))
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 5))
+    COMPRESS_STREAM_FLUSH_BYTES = int(os.getenv('COMPRESS_STREAM_FLUSH_BYTES', 64 * 1024))
+    RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    RATELIMIT_STORAGE = os.getenv('RATELIMIT_STORAGE', 'memory')
+    RATELIMITS = {
+        'auth.login': {'ip': '30/minute', 'username': '10/minute'},
+        'auth.signup': {'ip': '10/minute'},
+    }
+    PROXY_FIX_X_FOR = int(os.getenv('PROXY_FIX_X_FOR', 0))
+    REVOCATION_REFRESH_SECONDS = float(os.getenv('REVOCATION_REFRESH_SECONDS', 5))
     DEBUG = True
\ No newline at end of file
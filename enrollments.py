@@ -0,0 +1,77 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from models import Course, Student, student_course
+from transcripts import refresh_transcripts
+
+CHUNK_SIZE = 5000
+
+
+def _insert_ignore(dialect, pairs):
+    created = set()
+    for start in range(0, len(pairs), CHUNK_SIZE):
+        chunk = pairs[start:start + CHUNK_SIZE]
+        statement = (
+            dialect.insert(student_course)
+            .values([{'student_id': s, 'course_id': c} for s, c in chunk])
+            .on_conflict_do_nothing()
+            .returning(student_course.c.student_id, student_course.c.course_id)
+        )
+        created.update(tuple(row) for row in db.session.execute(statement))
+    return created
+
+
+def _insert_ignore_generic(pairs):
+    # Fallback for dialects without ON CONFLICT: read what exists, insert the
+    # rest. Concurrent enrollments of the same pair can still collide here.
+    student_ids = {s for s, _ in pairs}
+    course_ids = {c for _, c in pairs}
+    existing = set(tuple(row) for row in db.session.execute(
+        db.select(student_course.c.student_id, student_course.c.course_id)
+        .where(student_course.c.student_id.in_(student_ids), student_course.c.course_id.in_(course_ids))))
+    new = [p for p in pairs if p not in existing]
+    if new:
+        db.session.execute(student_course.insert(), [{'student_id': s, 'course_id': c} for s, c in new])
+    return set(new)
+
+
+def enroll_pairs(pairs):
+    """Insert (student_id, course_id) enrollments, skipping ones that exist.
+
+    On Postgres and SQLite this is a single ``INSERT ... ON CONFLICT DO
+    NOTHING RETURNING`` per chunk, so concurrent enrollments can't race each
+    other into a duplicate-key error. The new students' transcripts are rebuilt in
+    the same transaction. Returns (created, already_existing) as sorted
+    lists; the caller commits.
+    """
+    pairs = sorted(set(pairs))
+    if not pairs:
+        return [], []
+    name = db.engine.dialect.name
+    if name in ('postgresql', 'sqlite'):
+        created = _insert_ignore(postgresql if name == 'postgresql' else sqlite, pairs)
+    else:
+        created = _insert_ignore_generic(pairs)
+    refresh_transcripts(s for s, _ in created)
+    return sorted(created), [p for p in pairs if p not in created]
+
+
+def unknown_ids(student_ids=(), course_ids=()):
+    """Ids among the given ones that have no Student / Course row."""
+    known_students = set(db.session.execute(
+        db.select(Student.id).where(Student.id.in_(set(student_ids)))).scalars()) if student_ids else set()
+    known_courses = set(db.session.execute(
+        db.select(Course.id).where(Course.id.in_(set(course_ids)))).scalars()) if course_ids else set()
+    return sorted(set(student_ids) - known_students), sorted(set(course_ids) - known_courses)
+
+
+def id_list(value, name):
+    if not isinstance(value, list) or not value or not all(isinstance(v, int) and not isinstance(v, bool) for v in value):
+        raise ValueError(f"{name} must be a non-empty list of integer ids")
+    return value
+
+
+def enrollment_report(created, existing):
+    return {
+        'enrolled': [{'student_id': s, 'course_id': c} for s, c in created],
+        'already_enrolled': [{'student_id': s, 'course_id': c} for s, c in existing],
+    }
@@ -1,8 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
+from passwords import PasswordHasher
 
 
 db = SQLAlchemy()
-bcrypt = Bcrypt()
 jwt = JWTManager()
+password_hasher = PasswordHasher()
@@ -0,0 +1,44 @@
+from flask import request
+from sqlalchemy.orm import load_only
+
+
+class FieldsError(ValueError):
+    pass
+
+
+class Fieldset:
+    """Output fields of an endpoint and the columns each one needs.
+
+    ``columns`` maps a field name to the model attributes it reads. With
+    ``?fields=a,b`` only those fields are emitted and only their columns are
+    selected; other columns (``Course.modules``, ``User.password``...) are
+    never fetched.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    def from_request(self):
+        """Requested field names as a frozenset, or None for all of them."""
+        raw = request.args.get('fields')
+        if not raw:
+            return None
+        fields = frozenset(f.strip() for f in raw.split(',') if f.strip())
+        unknown = fields - set(self.columns)
+        if unknown:
+            raise FieldsError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        return fields or None
+
+    def options(self, fields):
+        """Loader options for a query or select; empty when every field is wanted."""
+        if fields is None:
+            return []
+        attributes = {column for field in fields for column in self.columns[field]}
+        return [load_only(*attributes)] if attributes else []
+
+    def apply(self, query, fields):
+        return query.options(*self.options(fields))
+
+    @staticmethod
+    def key(fields):
+        return tuple(sorted(fields)) if fields else None
@@ -0,0 +1,134 @@
+import csv
+import io
+from flask import current_app, request
+from sqlalchemy import insert, update
+from extensions import db
+from models import Course, Grade, Student
+from grade_stats import record_grade_changes
+from transcripts import refresh_transcripts
+
+
+class GradeImportError(ValueError):
+    pass
+
+
+def parse_grade_rows():
+    """Rows from a CSV upload (``file`` field or a text/csv body) or a JSON array."""
+    if 'file' in request.files:
+        text = request.files['file'].stream.read().decode('utf-8-sig')
+        return list(csv.DictReader(io.StringIO(text)))
+    if request.mimetype == 'text/csv':
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('grades')
+    if not isinstance(data, list):
+        raise GradeImportError('Expected a CSV file or a JSON array of grades')
+    return data
+
+
+def int_id(value, name):
+    """A student or course id from a JSON body, where it may arrive as "2"."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise GradeImportError(f'{name} must be an integer')
+
+
+def _clean(row):
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object')
+    try:
+        student_id = int(row.get('student_id'))
+        course_id = int(row.get('course_id'))
+    except (TypeError, ValueError):
+        raise ValueError('student_id and course_id must be integers')
+    grade = str(row.get('grade') or '').strip()
+    if not grade:
+        raise ValueError('Missing grade')
+    if len(grade) > 10:
+        raise ValueError('Grade must be at most 10 characters')
+    comments = row.get('comments') or None
+    if comments is not None and len(str(comments)) > 500:
+        raise ValueError('Comments must be at most 500 characters')
+    return {'student_id': student_id, 'course_id': course_id, 'grade': grade,
+            'comments': str(comments) if comments is not None else None}
+
+
+def import_grades(rows, instructor_id=None):
+    """Validate ``rows`` and upsert them by (student_id, course_id).
+
+    Ownership and existence are checked with one query per table for the
+    whole batch, new grades go in with one executemany INSERT and existing
+    ones with one executemany UPDATE, all in a single transaction together
+    with the matching course_grade_count and transcript changes. Invalid
+    rows are skipped and reported; valid ones are still written.
+    Returns (summary, errors, affected course ids).
+    """
+    max_rows = current_app.config.get('GRADE_IMPORT_MAX_ROWS', 10000)
+    if len(rows) > max_rows:
+        raise GradeImportError(f'At most {max_rows} rows per import')
+
+    errors, cleaned, seen = [], {}, set()
+    for index, row in enumerate(rows):
+        try:
+            item = _clean(row)
+        except ValueError as e:
+            errors.append({'row': index, 'error': str(e)})
+            continue
+        key = (item['student_id'], item['course_id'])
+        if key in seen:
+            errors.append({'row': index, 'error': 'Duplicate student_id and course_id in this import'})
+            continue
+        seen.add(key)
+        cleaned[index] = item
+
+    course_ids = {item['course_id'] for item in cleaned.values()}
+    student_ids = {item['student_id'] for item in cleaned.values()}
+    owners = dict(db.session.execute(
+        db.select(Course.id, Course.instructor_id).where(Course.id.in_(course_ids))).all()) if course_ids else {}
+    known_students = set(db.session.execute(
+        db.select(Student.id).where(Student.id.in_(student_ids))).scalars()) if student_ids else set()
+
+    for index, item in list(cleaned.items()):
+        error = None
+        if item['course_id'] not in owners:
+            error = 'Course not found'
+        elif instructor_id is not None and owners[item['course_id']] != instructor_id:
+            error = 'Cannot grade a course you don’t teach'
+        elif item['student_id'] not in known_students:
+            error = 'Student not found'
+        if error:
+            errors.append({'row': index, 'error': error})
+            del cleaned[index]
+
+    existing = {}
+    if cleaned:
+        rows_found = db.session.execute(
+            db.select(Grade.id, Grade.student_id, Grade.course_id, Grade.grade)
+            .where(Grade.course_id.in_({i['course_id'] for i in cleaned.values()}),
+                   Grade.student_id.in_({i['student_id'] for i in cleaned.values()})))
+        for grade_id, student_id, course_id, value in rows_found:
+            existing.setdefault((student_id, course_id), []).append((grade_id, value))
+
+    inserts, updates, changes = [], [], []
+    for item in cleaned.values():
+        current = existing.get((item['student_id'], item['course_id']))
+        if current:
+            for grade_id, value in current:
+                updates.append({'id': grade_id, 'grade': item['grade'], 'comments': item['comments']})
+                changes += [(item['course_id'], value, -1), (item['course_id'], item['grade'], 1)]
+        else:
+            inserts.append(item)
+            changes.append((item['course_id'], item['grade'], 1))
+    if inserts:
+        db.session.execute(insert(Grade), inserts)
+    if updates:
+        db.session.execute(update(Grade), updates)
+    record_grade_changes(changes)
+    refresh_transcripts(item['student_id'] for item in cleaned.values())
+    db.session.commit()
+
+    errors.sort(key=lambda e: e['row'])
+    summary = {'inserted': len(inserts), 'updated': len(cleaned) - len(inserts), 'failed': len(errors)}
+    return summary, errors, {item['course_id'] for item in cleaned.values()}
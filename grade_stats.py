@@ -0,0 +1,114 @@
+"""Per-course grade distribution kept up to date as grades are written.
+
+``course_grade_count`` holds one row per (course, grade value). ORM grade
+writes are picked up by a session ``after_flush`` hook and applied in the
+same transaction; Core bulk writes (grade_import.py) call
+``record_grade_changes`` themselves. Reading a course's statistics is then a
+primary-key range read of a handful of rows instead of a scan of ``grade``.
+"""
+from collections import Counter
+from sqlalchemy import event, func, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from extensions import db
+from models import CourseGradeCount, Grade, student_course
+
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D+': 1.3, 'D': 1.0, 'D-': 0.7,
+    'F': 0.0,
+}
+
+counts = CourseGradeCount.__table__
+
+
+def _upsert(connection, rows):
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = (postgresql if dialect == 'postgresql' else sqlite).insert(counts)
+        statement = insert.on_conflict_do_update(
+            index_elements=[counts.c.course_id, counts.c.grade],
+            set_={'count': counts.c.count + insert.excluded.count})
+        connection.execute(statement, rows)
+        return
+    for row in rows:
+        result = connection.execute(
+            update(counts)
+            .where(counts.c.course_id == row['course_id'], counts.c.grade == row['grade'])
+            .values(count=counts.c.count + row['count']))
+        if not result.rowcount:
+            connection.execute(counts.insert(), [row])
+
+
+def record_grade_changes(changes, connection=None):
+    """Apply (course_id, grade, delta) changes to the counts in the current transaction."""
+    totals = Counter()
+    for course_id, grade, delta in changes:
+        # An ORM write may still hold the id as sent in JSON ("2"); count it under 2.
+        totals[(int(course_id), str(grade))] += delta
+    rows = [{'course_id': course_id, 'grade': grade, 'count': delta}
+            for (course_id, grade), delta in sorted(totals.items()) if delta]
+    if rows:
+        _upsert(connection if connection is not None else db.session.connection(), rows)
+
+
+def _history_value(state, key):
+    history = state.attrs[key].history
+    if history.deleted:
+        return history.deleted[0]
+    return state.committed_state.get(key, getattr(state.obj(), key))
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_grade_writes(session, flush_context):
+    changes = []
+    for obj in session.new:
+        if isinstance(obj, Grade):
+            changes.append((obj.course_id, obj.grade, 1))
+    for obj in session.deleted:
+        if isinstance(obj, Grade):
+            state = inspect(obj)
+            changes.append((_history_value(state, 'course_id'), _history_value(state, 'grade'), -1))
+    for obj in session.dirty:
+        if isinstance(obj, Grade):
+            state = inspect(obj)
+            if not (state.attrs.course_id.history.has_changes() or state.attrs.grade.history.has_changes()):
+                continue
+            changes.append((_history_value(state, 'course_id'), _history_value(state, 'grade'), -1))
+            changes.append((obj.course_id, obj.grade, 1))
+    if changes:
+        record_grade_changes(changes, session.connection())
+
+
+def course_stats(course_id):
+    rows = db.session.execute(
+        select(counts.c.grade, counts.c.count)
+        .where(counts.c.course_id == course_id, counts.c.count != 0)).all()
+    distribution = {grade: count for grade, count in rows}
+    total = sum(distribution.values())
+    scaled = [(GRADE_POINTS[grade.strip().upper()], count) for grade, count in distribution.items()
+              if grade.strip().upper() in GRADE_POINTS]
+    scaled_count = sum(count for _, count in scaled)
+    enrolled = db.session.execute(
+        select(func.count()).select_from(student_course).where(student_course.c.course_id == course_id)).scalar()
+    return {
+        'course_id': course_id,
+        'graded': total,
+        'enrolled': enrolled,
+        'distribution': distribution,
+        'mean_points': round(sum(p * c for p, c in scaled) / scaled_count, 2) if scaled_count else None,
+        'unscaled': total - scaled_count,
+    }
+
+
+def rebuild_course_stats():
+    """Recount everything from ``grade``; returns the number of (course, grade) rows written."""
+    db.session.execute(counts.delete())
+    rows = db.session.execute(
+        select(Grade.course_id, Grade.grade, func.count()).group_by(Grade.course_id, Grade.grade)).all()
+    if rows:
+        db.session.execute(counts.insert(), [{'course_id': c, 'grade': g, 'count': n} for c, g, n in rows])
+    db.session.commit()
+    return len(rows)
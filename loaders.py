@@ -0,0 +1,95 @@
+from collections import defaultdict
+from flask import g
+from sqlalchemy.orm import load_only
+from extensions import db
+from models import Instructor, Course, Grade, student_course
+
+
+class BatchLoader:
+    """Collects keys and resolves all pending ones with a single batch query.
+
+    Call prime() with every key a response will need, then load() per row;
+    the first load() after priming runs one ``IN (...)`` query for the lot.
+    """
+
+    def __init__(self, batch_fn, default=None):
+        self._batch_fn = batch_fn
+        self._default = default
+        self._cache = {}
+        self._pending = set()
+
+    def prime(self, keys):
+        self._pending.update(k for k in keys if k is not None and k not in self._cache)
+        return self
+
+    def load(self, key):
+        if key is None:
+            return self._default() if callable(self._default) else self._default
+        if key not in self._cache:
+            self._pending.add(key)
+            self._dispatch()
+        return self._cache[key]
+
+    def clear(self):
+        self._cache.clear()
+        self._pending.clear()
+
+    def _dispatch(self):
+        keys, self._pending = self._pending, set()
+        found = self._batch_fn(list(keys))
+        for key in keys:
+            if key in found:
+                self._cache[key] = found[key]
+            else:
+                self._cache[key] = self._default() if callable(self._default) else self._default
+
+
+def _instructors_by_id(ids):
+    return {i.id: i for i in Instructor.query.filter(Instructor.id.in_(ids))}
+
+
+def _courses_by_id(ids):
+    # Grade rows only show the course name; leave the modules JSON unread.
+    return {c.id: c for c in Course.query.options(load_only(Course.id, Course.name)).filter(Course.id.in_(ids))}
+
+
+def _student_ids_by_course(course_ids):
+    rows = db.session.execute(
+        db.select(student_course.c.course_id, student_course.c.student_id)
+        .where(student_course.c.course_id.in_(course_ids))
+        .order_by(student_course.c.course_id, student_course.c.student_id)
+    )
+    result = defaultdict(list)
+    for course_id, student_id in rows:
+        result[course_id].append(student_id)
+    return result
+
+
+def _grade_ids_by_course(course_ids):
+    rows = db.session.execute(
+        db.select(Grade.course_id, Grade.id)
+        .where(Grade.course_id.in_(course_ids))
+        .order_by(Grade.course_id, Grade.id)
+    )
+    result = defaultdict(list)
+    for course_id, grade_id in rows:
+        result[course_id].append(grade_id)
+    return result
+
+
+LOADERS = {
+    'instructor': (_instructors_by_id, None),
+    'course': (_courses_by_id, None),
+    'course_students': (_student_ids_by_course, list),
+    'course_grades': (_grade_ids_by_course, list),
+}
+
+
+def loader(name):
+    """Request-scoped loader, so cached rows never outlive the request."""
+    if 'loaders' not in g:
+        g.loaders = {}
+    if name not in g.loaders:
+        batch_fn, default = LOADERS[name]
+        g.loaders[name] = BatchLoader(batch_fn, default)
+    return g.loaders[name]
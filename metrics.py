@@ -0,0 +1,93 @@
+"""Per-endpoint request metrics in Prometheus text format.
+
+Under several worker processes set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty, writable directory before the workers start; each process then
+writes its samples there and /metrics aggregates all of them.
+"""
+import os
+import time
+from flask import Response, current_app, g, has_request_context, jsonify, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Histogram,
+                               generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'Time to produce the response headers.',
+    ['endpoint', 'method', 'status'])
+SQL_STATEMENTS = Histogram(
+    'http_request_sql_statements', 'SQL statements executed per request.',
+    ['endpoint'], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144, 233))
+SQL_TIME = Histogram(
+    'http_request_sql_seconds', 'Time spent executing SQL per request.', ['endpoint'])
+BCRYPT_TIME = Histogram(
+    'http_request_bcrypt_seconds', 'Time spent hashing or verifying passwords per request.',
+    ['endpoint'], buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size.',
+    ['endpoint'], buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304))
+
+
+def _current():
+    return g.get('metrics') if has_request_context() else None
+
+
+def record_bcrypt(seconds):
+    current = _current()
+    if current is not None:
+        current['bcrypt'] += seconds
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the statement's context, which is discarded with it, so a
+    # statement that fails leaves nothing behind on the pooled connection.
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_metrics_start', None)
+    current = _current()
+    if current is not None:
+        current['sql_count'] += 1
+        if start is not None:
+            current['sql_time'] += time.perf_counter() - start
+
+
+def _before_request():
+    g.metrics = {'start': time.perf_counter(), 'sql_count': 0, 'sql_time': 0.0, 'bcrypt': 0.0}
+
+
+def _after_request(response):
+    current = g.pop('metrics', None)
+    if current is None or request.endpoint == 'metrics':
+        return response
+    endpoint = request.endpoint or 'unmatched'
+    REQUEST_LATENCY.labels(endpoint, request.method, response.status_code).observe(time.perf_counter() - current['start'])
+    SQL_STATEMENTS.labels(endpoint).observe(current['sql_count'])
+    SQL_TIME.labels(endpoint).observe(current['sql_time'])
+    if current['bcrypt']:
+        BCRYPT_TIME.labels(endpoint).observe(current['bcrypt'])
+    if response.content_length is not None:
+        RESPONSE_SIZE.labels(endpoint).observe(response.content_length)
+    return response
+
+
+def metrics_view():
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return jsonify({"error": "Unauthorized"}), 401
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def init_app(app):
+    app.before_request_funcs.setdefault(None, []).insert(0, _before_request)
+    app.after_request(_after_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
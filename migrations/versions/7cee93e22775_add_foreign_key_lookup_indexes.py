@@ -0,0 +1,39 @@
+"""Add indexes on foreign key lookup columns
+
+Revision ID: 7cee93e22775
+Revises: e07620f746de
+Create Date: 2026-10-18 15:05:12.418307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7cee93e22775'
+down_revision = 'e07620f746de'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_grade_student_id', 'grade', ['student_id']),
+    ('ix_grade_course_id', 'grade', ['course_id']),
+    ('ix_course_instructor_id', 'course', ['instructor_id']),
+    ('ix_student_course_course_id', 'student_course', ['course_id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block, and it
+    # only takes a SHARE UPDATE EXCLUSIVE lock, so writes keep flowing.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, if_not_exists=True,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,103 @@
+"""Key student and instructor profiles by user.id (expand)
+
+Revision ID: a7d4c2e9f150
+Revises: f3a9d6c1e724
+Create Date: 2026-10-18 20:11:36.902215
+
+First half of moving username, email and password off the profile tables.
+Safe to run while the previous release is serving: the duplicated columns
+only become nullable here and are dropped by c8e1f7a3b692 once every worker
+runs the new code.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4c2e9f150'
+down_revision = 'f3a9d6c1e724'
+branch_labels = None
+depends_on = None
+
+
+DUPLICATED = {
+    'student': [('username', sa.String(length=100)), ('email', sa.String(length=100)), ('password', sa.LargeBinary())],
+    'instructor': [('username', sa.String(length=100)), ('email', sa.String(length=100)), ('password', sa.LargeBinary())],
+}
+
+ORPHAN_STUDENTS = 'SELECT s.id FROM student s WHERE NOT EXISTS (SELECT 1 FROM "user" u WHERE u.id = s.id)'
+ORPHAN_INSTRUCTORS = 'SELECT i.id FROM instructor i WHERE NOT EXISTS (SELECT 1 FROM "user" u WHERE u.id = i.id)'
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == 'postgresql'
+    if postgres:
+        # Give up rather than queue behind a long transaction and block every query queued after us.
+        op.execute("SET LOCAL lock_timeout = '5s'")
+
+    for table, columns in DUPLICATED.items():
+        with op.batch_alter_table(table) as batch_op:
+            for name, type_ in columns:
+                batch_op.alter_column(name, existing_type=type_, nullable=True)
+
+    # Deleting a user used to leave its profile behind; those rows would fail
+    # the new foreign keys. Remove them with their grades and enrollments,
+    # keeping course_grade_count in step.
+    op.execute(f"""
+        UPDATE course_grade_count SET count = count - (
+            SELECT count(*) FROM grade g
+            WHERE g.course_id = course_grade_count.course_id AND g.grade = course_grade_count.grade
+              AND g.student_id IN ({ORPHAN_STUDENTS}))
+        WHERE EXISTS (
+            SELECT 1 FROM grade g
+            WHERE g.course_id = course_grade_count.course_id AND g.grade = course_grade_count.grade
+              AND g.student_id IN ({ORPHAN_STUDENTS}))
+    """)
+    op.execute(f'DELETE FROM grade WHERE student_id IN ({ORPHAN_STUDENTS})')
+    op.execute(f'DELETE FROM student_course WHERE student_id IN ({ORPHAN_STUDENTS})')
+    op.execute(f'DELETE FROM student_transcript WHERE student_id IN ({ORPHAN_STUDENTS})')
+    op.execute(f'DELETE FROM student WHERE id IN ({ORPHAN_STUDENTS})')
+    op.execute(f'UPDATE course SET instructor_id = NULL WHERE instructor_id IN ({ORPHAN_INSTRUCTORS})')
+    op.execute(f'DELETE FROM instructor WHERE id IN ({ORPHAN_INSTRUCTORS})')
+
+    # Users created without their profile (admin-created students, pending instructors).
+    op.execute("""
+        INSERT INTO student (id)
+        SELECT u.id FROM "user" u WHERE u.is_student AND NOT EXISTS (SELECT 1 FROM student s WHERE s.id = u.id)
+    """)
+    op.execute("""
+        INSERT INTO instructor (id, is_instructor_verified)
+        SELECT u.id, false FROM "user" u
+        WHERE u.is_instructor AND NOT EXISTS (SELECT 1 FROM instructor i WHERE i.id = u.id)
+    """)
+
+    if not postgres:
+        for table in DUPLICATED:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.create_foreign_key(f'{table}_id_fkey', 'user', ['id'], ['id'], ondelete='CASCADE')
+        return
+    # NOT VALID takes only a brief lock; the check of existing rows runs
+    # afterwards, in its own transaction, under a lock that lets writes through.
+    for table in DUPLICATED:
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_id_fkey FOREIGN KEY (id) '
+                   f'REFERENCES "user" (id) ON DELETE CASCADE NOT VALID')
+    with op.get_context().autocommit_block():
+        for table in DUPLICATED:
+            op.execute(f'ALTER TABLE {table} VALIDATE CONSTRAINT {table}_id_fkey')
+
+
+def downgrade():
+    for table in DUPLICATED:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'{table}_id_fkey', type_='foreignkey')
+        op.execute(f"""
+            UPDATE {table} SET
+                username = (SELECT u.username FROM "user" u WHERE u.id = {table}.id),
+                email = (SELECT u.email FROM "user" u WHERE u.id = {table}.id),
+                password = (SELECT u.password FROM "user" u WHERE u.id = {table}.id)
+            WHERE username IS NULL
+        """)
+        with op.batch_alter_table(table) as batch_op:
+            for name, type_ in DUPLICATED[table]:
+                batch_op.alter_column(name, existing_type=type_, nullable=False)
@@ -0,0 +1,35 @@
+"""Add course_grade_count for per-course grade statistics
+
+Revision ID: b41d6f0c2a97
+Revises: 7cee93e22775
+Create Date: 2026-10-18 16:42:07.118524
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41d6f0c2a97'
+down_revision = '7cee93e22775'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('course_grade_count',
+    sa.Column('course_id', sa.Integer(), nullable=False),
+    sa.Column('grade', sa.String(length=10), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['course_id'], ['course.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('course_id', 'grade')
+    )
+    # Backfill from existing grades; from here on the application keeps it current.
+    op.execute(
+        'INSERT INTO course_grade_count (course_id, grade, count) '
+        'SELECT course_id, grade, COUNT(*) FROM grade GROUP BY course_id, grade'
+    )
+
+
+def downgrade():
+    op.drop_table('course_grade_count')
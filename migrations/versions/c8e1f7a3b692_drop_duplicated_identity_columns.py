@@ -0,0 +1,54 @@
+"""Drop username, email and password from student and instructor (contract)
+
+Revision ID: c8e1f7a3b692
+Revises: b5f0e8d2c417
+Create Date: 2026-10-18 20:14:05.377410
+
+Run once no worker of the previous release is left: it still reads and
+writes these columns. Until then, upgrade to b5f0e8d2c417 rather than head.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e1f7a3b692'
+down_revision = 'b5f0e8d2c417'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = {
+    'student': [('username', sa.String(length=100)), ('email', sa.String(length=100)),
+                ('password', sa.LargeBinary()), ('is_student', sa.Boolean())],
+    'instructor': [('username', sa.String(length=100)), ('email', sa.String(length=100)),
+                   ('password', sa.LargeBinary()), ('is_instructor', sa.Boolean())],
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # DROP COLUMN only touches the catalog, but it needs an exclusive lock to do so.
+        op.execute("SET LOCAL lock_timeout = '5s'")
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for name, _ in columns:
+                batch_op.drop_column(name)
+
+
+def downgrade():
+    for table, columns in COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for name, type_ in columns:
+                batch_op.add_column(sa.Column(name, type_, nullable=True))
+        op.execute(f"""
+            UPDATE {table} SET
+                username = (SELECT u.username FROM "user" u WHERE u.id = {table}.id),
+                email = (SELECT u.email FROM "user" u WHERE u.id = {table}.id),
+                password = (SELECT u.password FROM "user" u WHERE u.id = {table}.id),
+                {columns[-1][0]} = true
+        """)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.create_unique_constraint(f'{table}_username_key', ['username'])
+            batch_op.create_unique_constraint(f'{table}_email_key', ['email'])
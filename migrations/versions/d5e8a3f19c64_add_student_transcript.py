@@ -0,0 +1,33 @@
+"""Add student_transcript for precomputed transcripts
+
+Revision ID: d5e8a3f19c64
+Revises: b41d6f0c2a97
+Create Date: 2026-10-18 17:20:31.504219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5e8a3f19c64'
+down_revision = 'b41d6f0c2a97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are filled by `flask backfill-transcripts`; until then a missing
+    # row is built on first read.
+    op.create_table('student_transcript',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('document', sa.JSON(), nullable=True),
+    sa.Column('gpa', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['student_id'], ['student.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('student_id')
+    )
+
+
+def downgrade():
+    op.drop_table('student_transcript')
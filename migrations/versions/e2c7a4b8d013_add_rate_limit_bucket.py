@@ -0,0 +1,30 @@
+"""Add rate_limit_bucket for shared rate limiting
+
+Revision ID: e2c7a4b8d013
+Revises: d5e8a3f19c64
+Create Date: 2026-10-18 18:04:55.297140
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2c7a4b8d013'
+down_revision = 'd5e8a3f19c64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rate_limit_bucket',
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('tokens', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.Float(), nullable=False),
+    sa.Column('allowed', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('rate_limit_bucket')
@@ -0,0 +1,38 @@
+"""Add course.search_vector and search indexes
+
+Revision ID: f3a9d6c1e724
+Revises: e2c7a4b8d013
+Create Date: 2026-10-18 19:02:47.118305
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a9d6c1e724'
+down_revision = 'e2c7a4b8d013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Postgres only: other databases use search.py's in-memory index.
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute("""
+        ALTER TABLE course ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(jsonb_to_tsvector('english', coalesce(modules::jsonb, '[]'::jsonb), '["string"]'), 'B')
+        ) STORED
+    """)
+    op.execute('CREATE INDEX ix_course_search_vector ON course USING gin (search_vector)')
+    op.execute('CREATE INDEX ix_course_name_trgm ON course USING gin (lower(name) gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('DROP INDEX IF EXISTS ix_course_name_trgm')
+    op.execute('DROP INDEX IF EXISTS ix_course_search_vector')
+    op.execute('ALTER TABLE course DROP COLUMN IF EXISTS search_vector')
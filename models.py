@@ -5,7 +5,7 @@ from datetime import datetime
 
 student_course = db.Table('student_course',
     db.Column('student_id', db.Integer, db.ForeignKey('student.id'), primary_key=True),
-    db.Column('course_id', db.Integer, db.ForeignKey('course.id'), primary_key=True)
+    db.Column('course_id', db.Integer, db.ForeignKey('course.id'), primary_key=True, index=True)
 )
 
 class User(db.Model):
@@ -17,6 +17,17 @@ class User(db.Model):
     is_admin = db.Column(db.Boolean, default=False)
     is_instructor = db.Column(db.Boolean, default=False)
     is_student = db.Column(db.Boolean, default=False)
+    # Role profiles, keyed by user.id. Set on signup so they are inserted in
+    # the same flush; deleting the user deletes them.
+    student = db.relationship('Student', uselist=False, cascade='all, delete-orphan',
+                              backref=db.backref('user', uselist=False))
+    instructor = db.relationship('Instructor', uselist=False, cascade='all, delete-orphan',
+                                 backref=db.backref('user', uselist=False))
+
+    def validate_role_flags(self):
+        """The checks that don't need the id, so they can run before the INSERT."""
+        if self.is_instructor and self.is_student:
+            raise ValueError("A user cannot be both an instructor and a student.")
 
     def validate_roles(self):
         if self.id == 1:
@@ -25,26 +36,19 @@ class User(db.Model):
         else:
             if self.is_admin:
                 raise ValueError("Only user with id=1 can be an admin.")
-        if self.is_instructor and self.is_student:
-            raise ValueError("A user cannot be both an instructor and a student.")
+        self.validate_role_flags()
 
 class Student(db.Model):
+    """Student profile of a User; identity (username, email, password) lives on User."""
     __tablename__ = "student"
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(100), nullable=False, unique=True)
-    email = db.Column(db.String(100), nullable=False, unique=True)
-    password = db.Column(db.LargeBinary, nullable=False)
-    is_student = db.Column(db.Boolean, default=True)
+    id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
     courses = db.relationship('Course', secondary=student_course, backref=db.backref('students', lazy='dynamic'))
 
 class Instructor(db.Model):
+    """Instructor profile of a User; identity (username, email, password) lives on User."""
     __tablename__ = "instructor"
-    id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(100), nullable=False, unique=True)
-    email = db.Column(db.String(100), nullable=False, unique=True)
-    password = db.Column(db.LargeBinary, nullable=False)
-    is_instructor = db.Column(db.Boolean, default=True)
-    is_instructor_verified = db.Column(db.Boolean, default=False)  
+    id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='CASCADE'), primary_key=True)
+    is_instructor_verified = db.Column(db.Boolean, default=False)
     courses = db.relationship('Course', backref='instructor', lazy='dynamic')
 
 class Course(db.Model):
@@ -52,7 +56,7 @@ class Course(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     duration = db.Column(db.Integer, nullable=False)
-    instructor_id = db.Column(db.Integer, db.ForeignKey("instructor.id"), nullable=True)
+    instructor_id = db.Column(db.Integer, db.ForeignKey("instructor.id"), nullable=True, index=True)
     image = db.Column(db.String(255), nullable=True)
     modules = db.Column(db.JSON, nullable=True)
     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
@@ -60,10 +64,39 @@ class Course(db.Model):
 class Grade(db.Model):
     __tablename__ = "grade"
     id = db.Column(db.Integer, primary_key=True)
-    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False)
-    course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id'), nullable=False, index=True)
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id'), nullable=False, index=True)
     grade = db.Column(db.String(10), nullable=False)
     comments = db.Column(db.String(500))
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     student = db.relationship('Student', backref=db.backref('grades', lazy='dynamic'))
-    course = db.relationship('Course', backref=db.backref('grades', lazy='dynamic'))
\ No newline at end of file
+    course = db.relationship('Course', backref=db.backref('grades', lazy='dynamic'))
+
+class CourseGradeCount(db.Model):
+    """Number of grades with each value per course, kept current by grade_stats.py."""
+    __tablename__ = "course_grade_count"
+    course_id = db.Column(db.Integer, db.ForeignKey('course.id', ondelete='CASCADE'), primary_key=True)
+    grade = db.Column(db.String(10), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class StudentTranscript(db.Model):
+    """Precomputed grades, courses and GPA per student, kept current by transcripts.py."""
+    __tablename__ = "student_transcript"
+    student_id = db.Column(db.Integer, db.ForeignKey('student.id', ondelete='CASCADE'), primary_key=True)
+    document = db.Column(db.JSON, nullable=True)
+    gpa = db.Column(db.Float, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RateLimitBucket(db.Model):
+    """Token bucket state shared by all workers when RATELIMIT_STORAGE = 'database'."""
+    __tablename__ = "rate_limit_bucket"
+    key = db.Column(db.String(255), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)
+    allowed = db.Column(db.Boolean, nullable=False, default=True)
+
+class RevokedToken(db.Model):
+    """JTIs of logged-out access tokens, kept until the token expires; see revocation.py."""
+    __tablename__ = "revoked_token"
+    jti = db.Column(db.String(36), primary_key=True)
+    expires_at = db.Column(db.Float, nullable=False, index=True)
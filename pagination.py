@@ -0,0 +1,76 @@
+import base64
+import binascii
+from urllib.parse import urlencode
+from flask import current_app, jsonify, request
+from compression import Precompressed, payload_response
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(value):
+    return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError('Invalid cursor')
+
+
+class Page:
+    """Keyset page parameters: ?limit=, ?cursor= and ?order=asc|desc."""
+
+    def __init__(self, limit, after=None, order='asc'):
+        self.limit = limit
+        self.after = after
+        self.order = order
+
+    @classmethod
+    def from_request(cls):
+        default = current_app.config.get('PAGE_SIZE_DEFAULT', 50)
+        maximum = current_app.config.get('PAGE_SIZE_MAX', 200)
+        try:
+            limit = int(request.args.get('limit', default))
+        except ValueError:
+            raise PaginationError('limit must be an integer')
+        if limit < 1:
+            raise PaginationError('limit must be positive')
+        order = request.args.get('order', 'asc').lower()
+        if order not in ('asc', 'desc'):
+            raise PaginationError("order must be 'asc' or 'desc'")
+        cursor = request.args.get('cursor')
+        return cls(min(limit, maximum), decode_cursor(cursor) if cursor else None, order)
+
+    @property
+    def key(self):
+        return (self.limit, self.after, self.order)
+
+    def apply(self, query, column):
+        """Filter, order and limit ``query`` on ``column``; returns (rows, next_cursor)."""
+        if self.after is not None:
+            query = query.filter(column > self.after if self.order == 'asc' else column < self.after)
+        query = query.order_by(column.asc() if self.order == 'asc' else column.desc())
+        rows = query.limit(self.limit + 1).all()
+        if len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        return rows, encode_cursor(getattr(rows[-1], column.key))
+
+
+def paginated(data, next_cursor, status=200):
+    """JSON array response with the next-page cursor headers; ``data`` may be pre-encoded bytes."""
+    if isinstance(data, (bytes, Precompressed)):
+        response = payload_response(data)
+    else:
+        response = jsonify(data)
+    response.status_code = status
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+        args = request.args.to_dict()
+        args['cursor'] = next_cursor
+        response.headers['Link'] = f'<{request.base_url}?{urlencode(args)}>; rel="next"'
+    return response
@@ -0,0 +1,114 @@
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+import bcrypt
+from metrics import record_bcrypt
+
+
+class PasswordServiceBusy(Exception):
+    """Raised when the hashing queue is full; callers should answer 503."""
+
+
+def _to_bytes(value):
+    if isinstance(value, str):
+        return value.encode('utf-8')
+    return bytes(value)
+
+
+def _hash(password, rounds, prefix):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds, prefix=prefix))
+
+
+def _verify(pw_hash, password):
+    try:
+        return bcrypt.checkpw(password, pw_hash)
+    except ValueError:
+        return False
+
+
+class PasswordHasher:
+    """bcrypt hashing and verification off the request thread.
+
+    Work runs in a per-process ``ProcessPoolExecutor`` with
+    ``PASSWORD_HASH_WORKERS`` processes. At most ``PASSWORD_HASH_QUEUE_DEPTH``
+    jobs may be queued or running; beyond that PasswordServiceBusy is raised
+    instead of letting requests pile up behind bcrypt. With
+    ``PASSWORD_HASH_WORKERS = 0`` everything runs inline, which is what tests
+    and scripts want. Hashes are compatible with Flask-Bcrypt's.
+    """
+
+    def __init__(self, app=None):
+        self.log_rounds = 12
+        self.prefix = b'2b'
+        self.workers = 0
+        self.timeout = 10
+        self._slots = threading.BoundedSemaphore(1)
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.log_rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.prefix = _to_bytes(app.config.get('BCRYPT_HASH_PREFIX', '2b'))
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', 10)
+        depth = app.config.get('PASSWORD_HASH_QUEUE_DEPTH', max(self.workers, 1) * 4)
+        self._slots = threading.BoundedSemaphore(depth)
+        app.extensions['password_hasher'] = self
+
+    def _executor(self):
+        # Pools don't survive fork(), so pre-forking servers get one per worker.
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pool_pid = os.getpid()
+                    atexit.register(self._pool.shutdown, wait=False, cancel_futures=True)
+        return self._pool
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PasswordServiceBusy('Password hashing queue is full')
+        start = time.perf_counter()
+        try:
+            if not self.workers:
+                try:
+                    return fn(*args)
+                finally:
+                    slots.release()
+            try:
+                future = self._executor().submit(fn, *args)
+            except BaseException:
+                slots.release()
+                raise
+            # The slot is freed when the job finishes, not when we stop
+            # waiting for it, so timed-out jobs still count towards the depth.
+            future.add_done_callback(lambda _: slots.release())
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeout:
+                future.cancel()
+                raise PasswordServiceBusy('Password hashing timed out')
+        finally:
+            record_bcrypt(time.perf_counter() - start)
+
+    def hash(self, password, rounds=None):
+        return self._run(_hash, _to_bytes(password), rounds or self.log_rounds, self.prefix)
+
+    def verify(self, pw_hash, password):
+        if not pw_hash:
+            return False
+        return self._run(_verify, _to_bytes(pw_hash), _to_bytes(password))
+
+    def needs_rehash(self, pw_hash):
+        """True when ``pw_hash`` was made with a different cost than the configured one."""
+        parts = _to_bytes(pw_hash).split(b'$')
+        try:
+            return int(parts[2]) != self.log_rounds
+        except (IndexError, ValueError):
+            return True
@@ -1,6 +1,6 @@
 import os
 import logging
-from config import Config
+from config import Config, engine_options
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -9,3 +9,5 @@ class ProductionConfig(Config):
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'https://group12-frontend.vercel.app/').split(',')
     CORS_RESOURCES = {r"/api/*": {"origins": CORS_ORIGINS}}
     SQLALCHEMY_ECHO = False  
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(pool_size=10, max_overflow=20, pool_recycle=900, pool_timeout=10)
+    RATELIMIT_STORAGE = os.getenv('RATELIMIT_STORAGE', 'database')
@@ -0,0 +1,149 @@
+"""Token-bucket rate limiting, configured per endpoint.
+
+``RATELIMITS`` maps an endpoint name to the buckets that guard it, e.g.
+``{'auth.login': {'ip': '30/minute', 'username': '10/minute'}}``. Checks run
+in a before_request hook, so a rejected request never reaches the view (or
+bcrypt). ``RATELIMIT_STORAGE = 'memory'`` keeps buckets per process;
+``'database'`` keeps them in ``rate_limit_bucket`` so all workers share them.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from sqlalchemy import case, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from extensions import db
+from models import RateLimitBucket
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        super().__init__('Rate limit exceeded')
+        self.retry_after = retry_after
+
+
+def parse_rate(rate):
+    """'10/minute' -> (capacity 10, refill of 10/60 tokens per second)."""
+    count, _, period = rate.partition('/')
+    try:
+        capacity = int(count)
+        seconds = PERIODS[period.strip().rstrip('s')]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    return capacity, capacity / seconds
+
+
+class MemoryBuckets:
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, rate, now):
+        """Take one token; returns 0 when allowed, else seconds until one is available."""
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return 0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBuckets:
+    """Buckets in ``rate_limit_bucket``, updated with one atomic upsert per check.
+
+    Runs on its own connection and commits immediately, independent of the
+    request's session. Every ``PRUNE_EVERY`` checks, rows idle for a day are
+    deleted; an idle bucket is full again, which is the same as no row.
+    """
+    PRUNE_EVERY = 1000
+    PRUNE_IDLE = 86400
+
+    def __init__(self):
+        self._checks = 0
+
+    def consume(self, key, capacity, rate, now):
+        table = RateLimitBucket.__table__
+        dialect = db.engine.dialect.name
+        if dialect not in ('postgresql', 'sqlite'):
+            raise RuntimeError(f"Database rate limiting is not supported on {dialect}")
+        insert = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+        elapsed = literal(now) - table.c.updated_at
+        refilled = case((table.c.tokens + elapsed * rate > capacity, literal(float(capacity))),
+                        else_=table.c.tokens + elapsed * rate)
+        statement = insert.values(key=key, tokens=capacity - 1.0, updated_at=now, allowed=True).on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                'tokens': case((refilled >= 1, refilled - 1), else_=refilled),
+                'updated_at': now,
+                'allowed': refilled >= 1,
+            }).returning(table.c.tokens, table.c.allowed)
+        self._checks += 1
+        with db.engine.begin() as connection:
+            tokens, allowed = connection.execute(statement).one()
+            if self._checks % self.PRUNE_EVERY == 0:
+                connection.execute(table.delete().where(table.c.updated_at < now - self.PRUNE_IDLE))
+        return 0 if allowed else (1 - tokens) / rate
+
+    def clear(self):
+        with db.engine.begin() as connection:
+            connection.execute(RateLimitBucket.__table__.delete())
+
+
+class RateLimiter:
+    def __init__(self):
+        self.storage = MemoryBuckets()
+        self.limits = {}
+        self.enabled = True
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATELIMIT_ENABLED', True)
+        kind = app.config.get('RATELIMIT_STORAGE', 'memory')
+        if kind == 'memory':
+            self.storage = MemoryBuckets()
+        elif kind == 'database':
+            self.storage = DatabaseBuckets()
+        else:
+            raise ValueError(f"Unknown RATELIMIT_STORAGE: {kind}")
+        self.limits = {endpoint: {scope: parse_rate(rate) for scope, rate in scopes.items()}
+                       for endpoint, scopes in app.config.get('RATELIMITS', {}).items()}
+        app.before_request(self._check)
+        app.extensions['rate_limiter'] = self
+
+    def _identities(self, scopes):
+        if 'ip' in scopes:
+            yield 'ip', request.remote_addr or 'unknown'
+        if 'username' in scopes:
+            data = request.get_json(silent=True)
+            username = data.get('username') if isinstance(data, dict) else None
+            if isinstance(username, str) and username:
+                yield 'username', username.strip().lower()
+
+    def _check(self):
+        if not self.enabled or request.method == 'OPTIONS':
+            return None
+        scopes = self.limits.get(request.endpoint)
+        if not scopes:
+            return None
+        now = time.time()
+        wait = 0
+        for scope, identity in self._identities(scopes):
+            capacity, rate = scopes[scope]
+            key = f"{request.endpoint}:{scope}:{identity}"
+            wait = max(wait, self.storage.consume(key, capacity, rate, now))
+        if wait:
+            current_app.logger.warning(f"Rate limited {request.endpoint} from {request.remote_addr}")
+            raise RateLimited(max(1, math.ceil(wait)))
+        return None
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,97 @@
+"""Access token revocation, for server-side logout.
+
+Logging out records the token's ``jti`` in ``revoked_token`` together with
+the token's own expiry. Every worker keeps the unexpired revoked JTIs in a
+dict (jti -> exp), so the blocklist check flask_jwt_extended runs on each
+protected request is a dict lookup, not a query. The dict is reloaded from
+the table at most every ``REVOCATION_REFRESH_SECONDS``; that reload is how a
+logout on one worker reaches the others. Entries and rows are dropped once
+their token has expired, since an expired token is rejected anyway.
+"""
+import threading
+import time
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from extensions import db, jwt
+from models import RevokedToken
+
+# Tokens minted with JWT_ACCESS_TOKEN_EXPIRES = False carry no exp.
+NO_EXPIRY_TTL = 365 * 86400
+
+
+class TokenRevocation:
+    """Revoked JTIs per process, refreshed from ``revoked_token``."""
+    PRUNE_EVERY = 60
+
+    def __init__(self):
+        self.refresh_seconds = 5.0
+        self._revoked = {}
+        self._refreshed_at = 0.0
+        self._refreshes = 0
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.refresh_seconds = app.config.get('REVOCATION_REFRESH_SECONDS', 5)
+        jwt.token_in_blocklist_loader(self.is_revoked)
+        app.extensions['token_revocation'] = self
+
+    def is_revoked(self, jwt_header, jwt_payload):
+        if time.time() - self._refreshed_at >= self.refresh_seconds:
+            self._refresh()
+        return jwt_payload.get('jti') in self._revoked
+
+    def revoke(self, jti, expires_at=None):
+        """Revoke a token for every worker; this one stops accepting it immediately."""
+        expires_at = expires_at or time.time() + NO_EXPIRY_TTL
+        table = RevokedToken.__table__
+        dialect = db.engine.dialect.name
+        if dialect in ('postgresql', 'sqlite'):
+            insert = (postgresql if dialect == 'postgresql' else sqlite).insert(table)
+            statement = insert.values(jti=jti, expires_at=expires_at).on_conflict_do_nothing(index_elements=[table.c.jti])
+        else:
+            statement = table.insert().values(jti=jti, expires_at=expires_at)
+        with db.engine.begin() as connection:
+            connection.execute(statement)
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def _refresh(self):
+        # One thread reloads; the others keep answering from the current dict.
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.time()
+            table = RevokedToken.__table__
+            self._refreshes += 1
+            try:
+                with db.engine.begin() as connection:
+                    if self._refreshes % self.PRUNE_EVERY == 0:
+                        connection.execute(table.delete().where(table.c.expires_at <= now))
+                    rows = connection.execute(
+                        select(table.c.jti, table.c.expires_at).where(table.c.expires_at > now)).all()
+            except SQLAlchemyError:
+                # Keep serving the last known set rather than failing every request.
+                current_app.logger.exception("Could not refresh revoked tokens")
+                self._refreshed_at = now
+                return
+            with self._lock:
+                # Revocations are never undone, so local entries that are not
+                # expired survive a reload that raced with their insert.
+                revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+                revoked.update(rows)
+                self._revoked = revoked
+            self._refreshed_at = now
+        finally:
+            self._refresh_lock.release()
+
+    def clear(self):
+        with db.engine.begin() as connection:
+            connection.execute(RevokedToken.__table__.delete())
+        with self._lock:
+            self._revoked = {}
+
+
+revocations = TokenRevocation()
@@ -1,77 +1,65 @@
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from extensions import db, bcrypt
-from supabase import create_client, Client
-import os
-from models import User, Grade, Course, Instructor
+from flask import Blueprint, current_app, jsonify, request
+from extensions import db, password_hasher
+from models import User, Grade, Course, Instructor, Student
+from authorization import require_role
+from pagination import Page, paginated
+from streaming import wants_stream, stream_json_array
+from cache import catalog_cache, json_body
+from compression import payload_response
+from schemas.serializers import (COURSE_FIELDS, GRADE_FIELDS, USER_FIELDS, dump_course, dump_courses, dump_user,
+                                 grade_summary, prime_grade_courses, prime_user_instructors, user_summary)
+from grade_import import GradeImportError, int_id, parse_grade_rows, import_grades
+from enrollments import enroll_pairs, enrollment_report, id_list, unknown_ids
+from db_pool import pool_status
+from storage import UploadTooLarge, image_storage
+from grade_stats import course_stats
+from accounts import AccountError, add_user, ensure_available
 
 admin_bp = Blueprint('admin', __name__)
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_ANON_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
 
 @admin_bp.route('/users', methods=['POST'])
-@jwt_required()
+@require_role('admin')
 def create_user():
-    from schemas import UserSchema
-    user_schema = UserSchema()
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     data = request.get_json()
     if not data or not all(key in data for key in ['username', 'email', 'password']):
         return jsonify({"error": "Missing required fields: username, email, and password"}), 400
-    existing_user = User.query.filter_by(username=data['username']).first()
-    if existing_user:
-        return jsonify({"error": "Username already exists"}), 400
-    existing_email = User.query.filter_by(email=data['email']).first()
-    if existing_email:
-        return jsonify({"error": "Email already exists"}), 400
-    new_user = User(
-        username=data['username'],
-        email=data['email'],
-        password=bcrypt.generate_password_hash(data['password'].encode('utf-8'))
-    )
-    new_user.is_admin = data.get('is_admin', False)
-    new_user.is_instructor = data.get('is_instructor', False)
-    new_user.is_student = data.get('is_student', True)
+    is_admin = data.get('is_admin', False)
+    is_instructor = data.get('is_instructor', False)
+    # Like signup: a user is a student unless another role was asked for.
+    is_student = data.get('is_student', not (is_instructor or is_admin))
     try:
-        db.session.add(new_user)
+        ensure_available(data['username'], data['email'])
+        new_user = add_user(data['username'], data['email'], password_hasher.hash(data['password']),
+                            is_admin=is_admin, is_instructor=is_instructor, is_student=is_student)
+        user_data = dump_user(new_user)
         db.session.commit()
-        return jsonify(user_schema.dump(new_user)), 201
+        return jsonify(user_data), 201
+    except AccountError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to create user: {str(e)}"}), 500
 
 @admin_bp.route('/users', methods=['GET'])
-@jwt_required()
+@require_role('admin')
 def get_users():
+    fields = USER_FIELDS.from_request()
+    if wants_stream():
+        statement = db.select(User).options(*USER_FIELDS.options(fields)).order_by(User.id)
+        return stream_json_array(statement, lambda user: user_summary(user, fields),
+                                 on_batch=lambda users: prime_user_instructors(users, fields))
+    page = Page.from_request()
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.filter_by(username=current_user_id).first()
-        if not current_user or not current_user.is_admin:
-            return jsonify({"error": "Unauthorized: Admin access required"}), 403
-        all_users = User.query.all()
-        user_data = [{
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'role': 'instructor' if user.is_instructor else 'student' if user.is_student else 'admin',
-            'is_instructor_verified': Instructor.query.filter_by(id=user.id).first().is_instructor_verified if user.is_instructor and Instructor.query.filter_by(id=user.id).first() else False
-        } for user in all_users]
-        return jsonify(user_data), 200
+        all_users, next_cursor = page.apply(USER_FIELDS.apply(User.query, fields), User.id)
+        prime_user_instructors(all_users, fields)
+        return paginated([user_summary(user, fields) for user in all_users], next_cursor)
     except Exception as e:
         print(f"Error in get_users: {str(e)}")
         return jsonify({"error": f"Failed to fetch users: {str(e)}"}), 500
 
 @admin_bp.route('/users/<int:user_id>', methods=['GET'])
-@jwt_required()
+@require_role('admin')
 def get_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     target_user = User.query.get_or_404(user_id)
     user_data = {
         'id': target_user.id,
@@ -82,12 +70,8 @@ def get_user(user_id):
     return jsonify(user_data), 200
 
 @admin_bp.route('/users/<int:user_id>', methods=['PUT'])
-@jwt_required()
+@require_role('admin')
 def update_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     target_user = User.query.get_or_404(user_id)
     data = request.get_json()
     if not data:
@@ -103,7 +87,7 @@ def update_user(user_id):
             return jsonify({"error": "Email already exists"}), 400
         target_user.email = data['email']
     if 'password' in data:
-        target_user.password = bcrypt.generate_password_hash(data['password'].encode('utf-8'))
+        target_user.password = password_hasher.hash(data['password'])
     is_instructor = data.get('is_instructor', None)
     if is_instructor is not None:
         target_user.is_instructor = bool(is_instructor)
@@ -115,6 +99,11 @@ def update_user(user_id):
         if target_user.is_student:
             target_user.is_instructor = False
     target_user.is_admin = data.get('is_admin', target_user.is_admin)
+    # Granting a role creates its profile; revoking one keeps it, with its enrollments and grades.
+    if target_user.is_student and target_user.student is None:
+        target_user.student = Student()
+    if target_user.is_instructor and target_user.instructor is None:
+        target_user.instructor = Instructor(is_instructor_verified=False)
     try:
         db.session.commit()
         user_data = {
@@ -129,28 +118,15 @@ def update_user(user_id):
         return jsonify({"error": f"Failed to update user: {str(e)}"}), 500
 
 @admin_bp.route('/users/<int:user_id>/approve-instructor', methods=['PUT'])
-@jwt_required()
+@require_role('admin')
 def approve_instructor(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user or not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     target_user = User.query.get_or_404(user_id)
     if not target_user.is_instructor:
         return jsonify({"error": "User is not requested as an instructor"}), 400
-    instructor = Instructor.query.filter_by(id=target_user.id).first()
-    if not instructor:
-        instructor = Instructor(
-            id=target_user.id,
-            username=target_user.username,
-            email=target_user.email,
-            password=target_user.password,
-            is_instructor=True,
-            is_instructor_verified=True
-        )
-        db.session.add(instructor)
+    if target_user.instructor is None:
+        target_user.instructor = Instructor(is_instructor_verified=True)
     else:
-        instructor.is_instructor_verified = True
+        target_user.instructor.is_instructor_verified = True
     try:
         db.session.commit()
         return jsonify({"message": f"Instructor {target_user.username} approved"}), 200
@@ -159,42 +135,38 @@ def approve_instructor(user_id):
         return jsonify({"error": f"Failed to approve instructor: {str(e)}"}), 500
 
 @admin_bp.route('/users/<int:user_id>', methods=['DELETE'])
-@jwt_required()
+@require_role('admin')
 def delete_user(user_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     target_user = User.query.get_or_404(user_id)
     try:
+        # Grades go through the ORM so grade statistics follow; the profile
+        # rows and enrollments are removed with the user.
+        course_ids = set()
+        for grade in Grade.query.filter_by(student_id=user_id):
+            course_ids.add(grade.course_id)
+            db.session.delete(grade)
+        if target_user.student is not None:
+            course_ids.update(c.id for c in target_user.student.courses)
+        if target_user.instructor is not None:
+            course_ids.update(c.id for c in target_user.instructor.courses)
         db.session.delete(target_user)
         db.session.commit()
+        catalog_cache.invalidate(*course_ids)
         return jsonify({"message": "User deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to delete user: {str(e)}"}), 500
 
 @admin_bp.route('/courses', methods=['POST'])
-@jwt_required()
+@require_role('admin')
 def create_course():
-    from extensions import db
-    from models import Course, User
-    from schemas import CourseSchema
-    course_schema = CourseSchema()
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
-
-   
     if 'image_file' in request.files:
         file = request.files['image_file']
-        file_name = file.filename
         try:
-            file_content = file.read()
-            response = supabase.storage.from_("course_images").upload(file_name, file_content)
-            image_url = f"https://group12-backend-cv2o.supabase.co/storage/v1/object/public/course_images/{file_name}"
-            return jsonify({"image": image_url}), 200
+            name, image_url, status = image_storage.upload(file)
+            return jsonify({"image": image_url, "upload": name, "status": status}), 202 if status == 'pending' else 200
+        except UploadTooLarge as e:
+            return jsonify({"error": str(e)}), 413
         except Exception as e:
             return jsonify({"error": f"Failed to upload image: {str(e)}"}), 500
 
@@ -211,54 +183,51 @@ def create_course():
     try:
         db.session.add(new_course)
         db.session.commit()
-        return jsonify(course_schema.dump(new_course)), 201
+        catalog_cache.invalidate(new_course.id)
+        return jsonify(dump_course(new_course)), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to create course: {str(e)}"}), 500
 
+@admin_bp.route('/uploads/<path:name>', methods=['GET'])
+@require_role('admin')
+def get_upload_status(name):
+    status = image_storage.status(name)
+    if status['status'] == 'unknown':
+        return jsonify({"error": "Upload not found"}), 404
+    return jsonify({"upload": name, "image": image_storage.backend.url(name), **status}), 200
+
 @admin_bp.route('/courses', methods=['GET'])
-@jwt_required()
+@require_role('admin')
 def get_courses():
+    page = Page.from_request()
+    fields = COURSE_FIELDS.from_request()
     try:
-        from schemas import CourseSchema
-        courses_schema = CourseSchema(many=True)
-        current_user_id = get_jwt_identity()
-        current_user = User.query.filter_by(username=current_user_id).first()
-        if not current_user or not current_user.is_admin:
-            return jsonify({"error": "Unauthorized: Admin access required"}), 403
-        courses = Course.query.all()
-        return jsonify(courses_schema.dump(courses)), 200
+        def build():
+            courses, next_cursor = page.apply(COURSE_FIELDS.apply(Course.query, fields), Course.id)
+            return json_body(dump_courses(courses, fields)), next_cursor
+        body, next_cursor = catalog_cache.page(page.key + (COURSE_FIELDS.key(fields),), build)
+        return paginated(body, next_cursor)
     except Exception as e:
         print(f"Error in get_courses: {str(e)}")
         return jsonify({"error": f"Failed to fetch courses: {str(e)}"}), 500
 
 @admin_bp.route('/courses/<int:course_id>', methods=['GET'])
-@jwt_required()
+@require_role('admin')
 def get_course(course_id):
-    from schemas import CourseSchema
-    course_schema = CourseSchema()
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
-    course = Course.query.get_or_404(course_id)
-    return jsonify(course_schema.dump(course)), 200
+    fields = COURSE_FIELDS.from_request()
+    body = catalog_cache.course(
+        course_id, lambda: json_body(dump_course(COURSE_FIELDS.apply(Course.query, fields).get_or_404(course_id), fields)),
+        COURSE_FIELDS.key(fields))
+    return payload_response(body), 200
 
 @admin_bp.route('/courses/<int:course_id>', methods=['PUT'])
-@jwt_required()
+@require_role('admin')
 def update_course(course_id):
-    from schemas import CourseSchema
     import logging
     logging.basicConfig(level=logging.DEBUG)
     logger = logging.getLogger(__name__)
 
-    course_schema = CourseSchema()
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        logger.warning(f"Unauthorized access attempt by {current_user_id}")
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
-    
     course = Course.query.get_or_404(course_id)
     data = request.get_json()
     logger.debug(f"Received data for course {course_id}: {data}")
@@ -279,102 +248,150 @@ def update_course(course_id):
     
     try:
         db.session.commit()
+        catalog_cache.invalidate(course_id)
         logger.info(f"Successfully updated course {course_id}")
-        return jsonify(course_schema.dump(course)), 200
+        return jsonify(dump_course(course)), 200
     except Exception as e:
         db.session.rollback()
         logger.error(f"Failed to update course {course_id}: {str(e)}")
         return jsonify({"error": f"Failed to update course: {str(e)}"}), 500
 
 @admin_bp.route('/courses/<int:course_id>', methods=['DELETE'])
-@jwt_required()
+@require_role('admin')
 def delete_course(course_id):
-    from schemas import CourseSchema
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     course = Course.query.get_or_404(course_id)
     try:
         db.session.delete(course)
         db.session.commit()
+        catalog_cache.invalidate(course_id)
         return jsonify({"message": "Course deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": f"Failed to delete course: {str(e)}"}), 500
 
+@admin_bp.route('/courses/<int:course_id>/stats', methods=['GET'])
+@require_role('admin')
+def get_course_stats(course_id):
+    course = Course.query.get_or_404(course_id)
+    return jsonify(course_stats(course.id)), 200
+
 @admin_bp.route('/instructors', methods=['GET'])
-@jwt_required()
+@require_role('admin')
 def get_instructors():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user or not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
-    instructors = User.query.filter_by(is_instructor=True).all()
-    return jsonify([{"id": i.id, "username": i.username} for i in instructors]), 200
+    page = Page.from_request()
+    instructors, next_cursor = page.apply(User.query.filter_by(is_instructor=True), User.id)
+    return paginated([{"id": i.id, "username": i.username} for i in instructors], next_cursor)
 
 @admin_bp.route('/grades', methods=['GET'])
-@jwt_required()
+@require_role('admin')
 def get_grades():
+    fields = GRADE_FIELDS.from_request()
+    if wants_stream():
+        statement = db.select(Grade).options(*GRADE_FIELDS.options(fields)).order_by(Grade.id)
+        return stream_json_array(statement, lambda g: grade_summary(g, fields),
+                                 on_batch=lambda grades: prime_grade_courses(grades, fields))
+    page = Page.from_request()
     try:
-        current_user_id = get_jwt_identity()
-        current_user = User.query.filter_by(username=current_user_id).first()
-        if not current_user or not current_user.is_admin:
-            return jsonify({"error": "Unauthorized: Admin access required"}), 403
-        grades = Grade.query.all()
-        grade_data = [{
-            'id': g.id,
-            'student_id': g.student_id,
-            'course_id': g.course_id,
-            'grade': g.grade,
-            'course': {'name': g.course.name} if g.course else None
-        } for g in grades]
-        return jsonify(grade_data), 200
+        grades, next_cursor = page.apply(GRADE_FIELDS.apply(Grade.query, fields), Grade.id)
+        prime_grade_courses(grades, fields)
+        return paginated([grade_summary(g, fields) for g in grades], next_cursor)
     except Exception as e:
         print(f"Error in get_grades: {str(e)}")
         return jsonify({"error": f"Failed to fetch grades: {str(e)}"}), 500
 
 @admin_bp.route('/grades', methods=['POST'])
-@jwt_required()
+@require_role('admin')
 def create_grade():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     data = request.get_json()
     student_id = data.get('student_id')
     course_id = data.get('course_id')
     grade_value = data.get('grade')
     if not all([student_id, course_id, grade_value]):
         return jsonify({"error": "Missing required fields"}), 400
+    try:
+        student_id, course_id = int_id(student_id, 'student_id'), int_id(course_id, 'course_id')
+    except GradeImportError as e:
+        return jsonify({"error": str(e)}), 400
     new_grade = Grade(student_id=student_id, course_id=course_id, grade=grade_value)
     db.session.add(new_grade)
     db.session.commit()
+    catalog_cache.invalidate(course_id)
     return jsonify({"message": "Grade created", "id": new_grade.id}), 201
 
+@admin_bp.route('/grades/bulk', methods=['POST'])
+@require_role('admin')
+def bulk_import_grades():
+    try:
+        rows = parse_grade_rows()
+        summary, errors, course_ids = import_grades(rows)
+    except GradeImportError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to import grades: {str(e)}"}), 500
+    catalog_cache.invalidate(*course_ids)
+    status = 400 if errors and not (summary['inserted'] or summary['updated']) else 200
+    return jsonify({**summary, "errors": errors}), status
+
 @admin_bp.route('/grades/<int:grade_id>', methods=['PUT'])
-@jwt_required()
+@require_role('admin')
 def update_grade(grade_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     grade = Grade.query.get_or_404(grade_id)
+    old_course_id = grade.course_id
     data = request.get_json()
-    grade.student_id = data.get('student_id', grade.student_id)
-    grade.course_id = data.get('course_id', grade.course_id)
+    try:
+        student_id = int_id(data.get('student_id', grade.student_id), 'student_id')
+        course_id = int_id(data.get('course_id', grade.course_id), 'course_id')
+    except GradeImportError as e:
+        return jsonify({"error": str(e)}), 400
+    grade.student_id = student_id
+    grade.course_id = course_id
     grade.grade = data.get('grade', grade.grade)
     db.session.commit()
+    catalog_cache.invalidate(old_course_id, course_id)
     return jsonify({"message": "Grade updated"}), 200
 
 @admin_bp.route('/grades/<int:grade_id>', methods=['DELETE'])
-@jwt_required()
+@require_role('admin')
 def delete_grade(grade_id):
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user.is_admin:
-        return jsonify({"error": "Unauthorized: Admin access required"}), 403
     grade = Grade.query.get_or_404(grade_id)
+    course_id = grade.course_id
     db.session.delete(grade)
     db.session.commit()
-    return jsonify({"message": "Grade deleted"}), 200
\ No newline at end of file
+    catalog_cache.invalidate(course_id)
+    return jsonify({"message": "Grade deleted"}), 200
+
+@admin_bp.route('/enrollments', methods=['POST'])
+@require_role('admin')
+def bulk_enroll():
+    data = request.get_json(silent=True) or {}
+    try:
+        student_ids = id_list(data.get('student_ids'), 'student_ids')
+        course_ids = id_list(data.get('course_ids'), 'course_ids')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    max_pairs = current_app.config.get('ENROLLMENT_BULK_MAX_PAIRS', 50000)
+    if len(set(student_ids)) * len(set(course_ids)) > max_pairs:
+        return jsonify({"error": f"At most {max_pairs} student/course pairs per request"}), 400
+    unknown_students, unknown_courses = unknown_ids(student_ids, course_ids)
+    if unknown_students or unknown_courses:
+        return jsonify({"error": "Unknown students or courses", "unknown_student_ids": unknown_students,
+                        "unknown_course_ids": unknown_courses}), 400
+    try:
+        created, existing = enroll_pairs([(s, c) for s in student_ids for c in course_ids])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Failed to enroll students: {str(e)}"}), 500
+    catalog_cache.invalidate(*{c for _, c in created})
+    return jsonify(enrollment_report(created, existing)), 200
+
+@admin_bp.route('/cache-stats', methods=['GET'])
+@require_role('admin')
+def get_cache_stats():
+    return jsonify({"catalog": catalog_cache.stats()}), 200
+
+@admin_bp.route('/db/pool', methods=['GET'])
+@require_role('admin')
+def get_pool_status():
+    return jsonify(pool_status(db.engine)), 200
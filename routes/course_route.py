@@ -0,0 +1,83 @@
+import logging
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+from models import Course
+from schemas.serializers import COURSE_FIELDS, dump_course, dump_courses
+from pagination import Page, encode_cursor, paginated
+from cache import catalog_cache, json_body
+from compression import payload_response
+from search import course_search, search_terms
+
+course_bp = Blueprint('course', __name__)
+logger = logging.getLogger(__name__)
+
+
+def jwt_required_optional(fn):
+    def wrapper(*args, **kwargs):
+        if request.method == 'OPTIONS':
+            logger.debug(f"Handling OPTIONS request for {request.path}")
+            return '', 200
+        return jwt_required()(fn)(*args, **kwargs)
+    wrapper.__name__ = fn.__name__
+    return wrapper
+
+@course_bp.route('', methods=['GET', 'OPTIONS'])
+@jwt_required_optional
+def get_courses():
+    if request.method == 'OPTIONS':
+        logger.debug("Handling OPTIONS request for /api/courses")
+        return '', 200
+    page = Page.from_request()
+    fields = COURSE_FIELDS.from_request()
+    try:
+        def build():
+            logger.debug("Fetching courses page")
+            courses, next_cursor = page.apply(COURSE_FIELDS.apply(Course.query, fields), Course.id)
+            logger.debug(f"Found {len(courses)} courses")
+            return json_body(dump_courses(courses, fields)), next_cursor
+        body, next_cursor = catalog_cache.page(page.key + (COURSE_FIELDS.key(fields),), build)
+        return paginated(body, next_cursor)
+    except Exception as e:
+        logger.error(f"Error in get_courses: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to fetch courses: {str(e)}"}), 500
+
+@course_bp.route('/search', methods=['GET', 'OPTIONS'])
+@jwt_required_optional
+def search_courses():
+    if request.method == 'OPTIONS':
+        logger.debug("Handling OPTIONS request for /api/courses/search")
+        return '', 200
+    terms = search_terms(request.args.get('q'))
+    page = Page.from_request()
+    fields = COURSE_FIELDS.from_request()
+    offset = max(page.after or 0, 0)
+    try:
+        def build():
+            logger.debug(f"Searching courses for {terms}")
+            courses, more = course_search.search(terms, offset, page.limit, COURSE_FIELDS.options(fields))
+            logger.debug(f"Found {len(courses)} courses")
+            return json_body(dump_courses(courses, fields)), encode_cursor(offset + page.limit) if more else None
+        key = ('search', ' '.join(terms), page.limit, offset, COURSE_FIELDS.key(fields))
+        body, next_cursor = catalog_cache.page(key, build)
+        return paginated(body, next_cursor)
+    except Exception as e:
+        logger.error(f"Error in search_courses: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to search courses: {str(e)}"}), 500
+
+@course_bp.route('/<int:course_id>', methods=['GET', 'OPTIONS'])
+@jwt_required_optional
+def get_course(course_id):
+    if request.method == 'OPTIONS':
+        logger.debug(f"Handling OPTIONS request for /api/courses/{course_id}")
+        return '', 200
+    fields = COURSE_FIELDS.from_request()
+    try:
+        def build():
+            logger.debug(f"Fetching course with ID: {course_id}")
+            course = COURSE_FIELDS.apply(Course.query, fields).get_or_404(course_id)
+            logger.debug("Course found, serializing data")
+            return json_body(dump_course(course, fields))
+        return payload_response(catalog_cache.course(course_id, build, COURSE_FIELDS.key(fields))), 200
+    except Exception as e:
+        logger.error(f"Error fetching course {course_id}: {str(e)}", exc_info=True)
+        return jsonify({"error": f"Failed to fetch course: {str(e)}"}), 500
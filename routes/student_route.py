@@ -1,50 +1,61 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
 from extensions import db
-from models import User, Course, Grade, student_course  
+from models import Course, student_course
+from authorization import require_role, current_user_id
+from cache import catalog_cache
+from enrollments import enroll_pairs, enrollment_report, id_list, unknown_ids
+from transcripts import get_transcript
 
 student_bp = Blueprint('student_bp', __name__)
 
 @student_bp.route('/my-grades', methods=['GET'])
-@jwt_required()
+@require_role('student')
 def get_student_grades():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user or not current_user.is_student:  
-        return jsonify({"error": "Unauthorized: Student access required"}), 403
-    grades = Grade.query.filter_by(student_id=current_user.id).all()  
-    grade_data = [{
-        'id': g.id,
-        'course_id': g.course_id,
-        'grade': g.grade,
-        'course': {'name': g.course.name} if g.course else None
-    } for g in grades]
-    return jsonify(grade_data), 200
+    student_id = current_user_id()
+    return jsonify(get_transcript(student_id)['grades']), 200
+
+@student_bp.route('/transcript', methods=['GET'])
+@require_role('student')
+def get_student_transcript():
+    student_id = current_user_id()
+    return jsonify(get_transcript(student_id)), 200
 
 @student_bp.route('/enroll', methods=['POST'])
-@jwt_required()
+@require_role('student')
 def enroll_in_course():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user or not current_user.is_student:  # Use is_student
-        return jsonify({"error": "Unauthorized: Student access required"}), 403
+    student_id = current_user_id()
     data = request.get_json()
     course_id = data.get('course_id')
     course = Course.query.get_or_404(course_id)
-    if db.session.query(student_course).filter_by(student_id=current_user.id, course_id=course_id).first():
-        return jsonify({"error": "Already enrolled in this course"}), 400
-    db.session.execute(student_course.insert().values(student_id=current_user.id, course_id=course_id))
+    created, _ = enroll_pairs([(student_id, course.id)])
     db.session.commit()
+    if not created:
+        return jsonify({"error": "Already enrolled in this course"}), 400
+    catalog_cache.invalidate(course.id)
     return jsonify({"message": "Enrolled successfully"}), 200
 
+@student_bp.route('/enroll/bulk', methods=['POST'])
+@require_role('student')
+def bulk_enroll_in_courses():
+    student_id = current_user_id()
+    data = request.get_json(silent=True) or {}
+    try:
+        course_ids = id_list(data.get('course_ids'), 'course_ids')
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    _, unknown_courses = unknown_ids(course_ids=course_ids)
+    if unknown_courses:
+        return jsonify({"error": "Unknown courses", "unknown_course_ids": unknown_courses}), 400
+    created, existing = enroll_pairs([(student_id, c) for c in course_ids])
+    db.session.commit()
+    catalog_cache.invalidate(*{c for _, c in created})
+    return jsonify(enrollment_report(created, existing)), 200
+
 @student_bp.route('/my-courses', methods=['GET'])
-@jwt_required()
+@require_role('student')
 def get_my_courses():
-    current_user_id = get_jwt_identity()
-    current_user = User.query.filter_by(username=current_user_id).first()
-    if not current_user or not current_user.is_student:
-        return jsonify({"error": "Unauthorized: Student access required"}), 403
-    courses = Course.query.join(student_course).filter(student_course.c.student_id == current_user.id).all()
+    student_id = current_user_id()
+    courses = Course.query.join(student_course).filter(student_course.c.student_id == student_id).all()
     course_data = [{
         'id': c.id,
         'name': c.name,
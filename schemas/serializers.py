@@ -0,0 +1,146 @@
+"""Read-path serializers producing the same output as the marshmallow schemas.
+
+The schemas in this package stay the source of truth for validation; these
+plain functions skip marshmallow's per-field machinery and fetch the
+``students`` and ``grades`` id lists of a whole page of courses with one
+grouped query each instead of one per course.
+"""
+from fieldsets import Fieldset
+from loaders import loader
+from models import Course, Grade, User
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _bool(value):
+    return bool(value) if value is not None else None
+
+
+COURSE_FIELDS = Fieldset({
+    'id': (Course.id,),
+    'name': (Course.name,),
+    'duration': (Course.duration,),
+    'instructor_id': (Course.instructor_id,),
+    'instructor': (Course.instructor_id,),
+    'image': (Course.image,),
+    'modules': (Course.modules,),
+    'created_at': (Course.created_at,),
+    'students': (Course.id,),
+    'grades': (Course.id,),
+})
+
+
+def dump_courses(courses, fields=None):
+    """``fields`` limits the output (see COURSE_FIELDS); students and grades are only looked up when asked for."""
+    wanted = fields or COURSE_FIELDS.columns
+    students = loader('course_students').prime(c.id for c in courses) if 'students' in wanted else None
+    grades = loader('course_grades').prime(c.id for c in courses) if 'grades' in wanted else None
+    if fields is None:
+        return [{
+            'id': c.id,
+            'name': c.name,
+            'duration': c.duration,
+            'instructor_id': c.instructor_id,
+            'instructor': c.instructor_id,
+            'image': c.image,
+            'modules': c.modules,
+            'created_at': _iso(c.created_at),
+            'students': [{'id': student_id} for student_id in students.load(c.id)],
+            'grades': grades.load(c.id),
+        } for c in courses]
+    getters = {
+        'id': lambda c: c.id,
+        'name': lambda c: c.name,
+        'duration': lambda c: c.duration,
+        'instructor_id': lambda c: c.instructor_id,
+        'instructor': lambda c: c.instructor_id,
+        'image': lambda c: c.image,
+        'modules': lambda c: c.modules,
+        'created_at': lambda c: _iso(c.created_at),
+        'students': lambda c: [{'id': student_id} for student_id in students.load(c.id)],
+        'grades': lambda c: grades.load(c.id),
+    }
+    return [{field: getters[field](c) for field in fields} for c in courses]
+
+
+def dump_course(course, fields=None):
+    return dump_courses([course], fields)[0]
+
+
+GRADE_FIELDS = Fieldset({
+    'id': (Grade.id,),
+    'student_id': (Grade.student_id,),
+    'course_id': (Grade.course_id,),
+    'grade': (Grade.grade,),
+    'course': (Grade.course_id,),
+})
+
+
+def prime_grade_courses(grades, fields=None):
+    if fields is None or 'course' in fields:
+        loader('course').prime(g.course_id for g in grades)
+
+
+def grade_summary(g, fields=None):
+    """Row of the admin and instructor grade lists; call prime_grade_courses() on the batch first."""
+    wanted = fields or GRADE_FIELDS.columns
+    data = {}
+    if 'id' in wanted:
+        data['id'] = g.id
+    if 'student_id' in wanted:
+        data['student_id'] = g.student_id
+    if 'course_id' in wanted:
+        data['course_id'] = g.course_id
+    if 'grade' in wanted:
+        data['grade'] = g.grade
+    if 'course' in wanted:
+        course = loader('course').load(g.course_id)
+        data['course'] = {'name': course.name} if course else None
+    return data
+
+
+USER_FIELDS = Fieldset({
+    'id': (User.id,),
+    'username': (User.username,),
+    'email': (User.email,),
+    'role': (User.is_instructor, User.is_student),
+    'is_instructor_verified': (User.is_instructor,),
+})
+
+
+def prime_user_instructors(users, fields=None):
+    if fields is not None and 'is_instructor_verified' not in fields:
+        return
+    loader('instructor').clear()
+    loader('instructor').prime(u.id for u in users if u.is_instructor)
+
+
+def user_summary(user, fields=None):
+    """Row of the admin user list; call prime_user_instructors() on the batch first."""
+    wanted = fields or USER_FIELDS.columns
+    data = {}
+    if 'id' in wanted:
+        data['id'] = user.id
+    if 'username' in wanted:
+        data['username'] = user.username
+    if 'email' in wanted:
+        data['email'] = user.email
+    if 'role' in wanted:
+        data['role'] = 'instructor' if user.is_instructor else 'student' if user.is_student else 'admin'
+    if 'is_instructor_verified' in wanted:
+        instructor = loader('instructor').load(user.id) if user.is_instructor else None
+        data['is_instructor_verified'] = bool(instructor and instructor.is_instructor_verified)
+    return data
+
+
+def dump_user(user):
+    return {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'is_admin': _bool(user.is_admin),
+        'is_instructor': _bool(user.is_instructor),
+        'is_student': _bool(user.is_student),
+    }
@@ -0,0 +1,182 @@
+"""Ranked search over course names and module content.
+
+On Postgres the ``course.search_vector`` column (a generated ``tsvector``,
+name weighted above modules) answers full-text and prefix queries from its
+GIN index, and a trigram index on ``lower(name)`` catches typos. Elsewhere
+(SQLite in development and tests) an in-memory inverted index over the same
+text is built on first use and dropped whenever a Course write commits.
+Results are ordered by rank, then id; the page cursor is an offset.
+"""
+import difflib
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from sqlalchemy import event, func, literal, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Session
+from extensions import db
+from models import Course
+
+TOKEN = re.compile(r'\w+')
+MAX_TERMS = 10
+NAME_WEIGHT = 2.0
+MODULES_WEIGHT = 1.0
+
+
+# Mirrors migration f3a9d6c1e724, so `flask init-db` on Postgres gets the same schema.
+POSTGRES_SCHEMA = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    """ALTER TABLE course ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+        setweight(jsonb_to_tsvector('english', coalesce(modules::jsonb, '[]'::jsonb), '["string"]'), 'B')
+    ) STORED""",
+    'CREATE INDEX IF NOT EXISTS ix_course_search_vector ON course USING gin (search_vector)',
+    'CREATE INDEX IF NOT EXISTS ix_course_name_trgm ON course USING gin (lower(name) gin_trgm_ops)',
+)
+
+
+class SearchError(ValueError):
+    pass
+
+
+def search_terms(q):
+    """Lowercased word tokens of a query; raises SearchError if there are none."""
+    terms = TOKEN.findall((q or '').lower())[:MAX_TERMS]
+    if not terms:
+        raise SearchError('q must contain at least one word')
+    return terms
+
+
+def _strings(value):
+    """Every string inside a JSON value (module titles, content...)."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _strings(item)
+
+
+def create_search_schema(connection):
+    """Add the search column and indexes on Postgres; a no-op elsewhere."""
+    if connection.dialect.name == 'postgresql':
+        for statement in POSTGRES_SCHEMA:
+            connection.exec_driver_sql(statement)
+
+
+class MemoryIndex:
+    """token -> {course_id: weight}, with a sorted vocabulary for prefix and typo lookups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._vocabulary = []
+        self._generation = 0
+
+    def invalidate(self):
+        with self._lock:
+            self._postings = None
+            self._generation += 1
+
+    def _index(self):
+        with self._lock:
+            if self._postings is not None:
+                return self._postings, self._vocabulary
+            generation = self._generation
+        postings = defaultdict(lambda: defaultdict(float))
+        for course_id, name, modules in db.session.execute(select(Course.id, Course.name, Course.modules)):
+            for token in TOKEN.findall((name or '').lower()):
+                postings[token][course_id] += NAME_WEIGHT
+            for text in _strings(modules):
+                for token in TOKEN.findall(text.lower()):
+                    postings[token][course_id] += MODULES_WEIGHT
+        postings = {token: dict(hits) for token, hits in postings.items()}
+        vocabulary = sorted(postings)
+        with self._lock:
+            # A write committed while we were reading: keep serving, but rebuild next time.
+            if generation == self._generation:
+                self._postings, self._vocabulary = postings, vocabulary
+        return postings, vocabulary
+
+    def _expand(self, term, postings, vocabulary):
+        """Tokens matching ``term`` with a score factor: exact 1, prefix 0.5, close spelling 0.25."""
+        matches = {term: 1.0} if term in postings else {}
+        start = bisect_left(vocabulary, term)
+        for token in vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            matches.setdefault(token, 0.5)
+        if not matches:
+            matches = {token: 0.25 for token in difflib.get_close_matches(term, vocabulary, n=3, cutoff=0.8)}
+        return matches
+
+    def search(self, terms):
+        """Course ids matching every term, best first."""
+        postings, vocabulary = self._index()
+        scores = None
+        for term in terms:
+            term_scores = defaultdict(float)
+            for token, factor in self._expand(term, postings, vocabulary).items():
+                for course_id, weight in postings[token].items():
+                    term_scores[course_id] += weight * factor
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {cid: score + term_scores[cid] for cid, score in scores.items() if cid in term_scores}
+            if not scores:
+                return []
+        return [cid for cid, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))]
+
+
+class CourseSearch:
+    def __init__(self):
+        self.memory = MemoryIndex()
+
+    def search(self, terms, offset, limit, options=()):
+        """One page of matching courses as (courses, has_more)."""
+        if db.engine.dialect.name == 'postgresql':
+            courses = self._search_postgres(terms, offset, limit + 1, options)
+        else:
+            courses = self._search_memory(terms, offset, limit + 1, options)
+        return courses[:limit], len(courses) > limit
+
+    def _search_postgres(self, terms, offset, limit, options):
+        vector = literal_column('course.search_vector', TSVECTOR)
+        tsquery = func.to_tsquery('english', ' & '.join(f'{term}:*' for term in terms))
+        phrase = ' '.join(terms)
+        name = func.lower(Course.name)
+        rank = func.ts_rank(vector, tsquery) + func.word_similarity(phrase, name)
+        return (Course.query.options(*options)
+                .filter(or_(vector.op('@@')(tsquery), literal(phrase).op('<%')(name)))
+                .order_by(rank.desc(), Course.id)
+                .offset(offset).limit(limit).all())
+
+    def _search_memory(self, terms, offset, limit, options):
+        ids = self.memory.search(terms)[offset:offset + limit]
+        if not ids:
+            return []
+        by_id = {c.id: c for c in Course.query.options(*options).filter(Course.id.in_(ids))}
+        return [by_id[cid] for cid in ids if cid in by_id]
+
+
+course_search = CourseSearch()
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_course_writes(session, flush_context):
+    if any(isinstance(obj, Course) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['course_search_stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _drop_stale_index(session):
+    if session.info.pop('course_search_stale', False):
+        course_search.memory.invalidate()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _forget_rolled_back(session):
+    session.info.pop('course_search_stale', None)
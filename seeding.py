@@ -0,0 +1,158 @@
+"""Bulk loading of synthetic data, for staging and benchmark databases.
+
+Rows are generated lazily and written in batches of ``batch_size``: with
+``COPY ... FROM STDIN`` on Postgres (psycopg2) and executemany inserts
+elsewhere, so millions of rows never sit in memory at once. Every account
+shares one password hash, computed by the caller once. Ids are assigned
+explicitly (admin is 1, then instructors, then students), so the target
+tables must be empty; ``truncate_tables`` gets them there.
+"""
+import csv
+import io
+import json
+import random
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import func, select, text
+from extensions import db
+from models import User, Student, Instructor, Course, Grade, student_course
+
+GRADE_LETTERS = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'D', 'F']
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        return '\\x' + value.hex()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _copy(connection, table, batch):
+    columns = list(batch[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow(['' if v is None else v for v in map(_copy_value, (row[c] for c in columns))])
+    buffer.seek(0)
+    preparer = connection.dialect.identifier_preparer
+    names = ', '.join(preparer.quote(c) for c in columns)
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f'COPY {preparer.format_table(table)} ({names}) FROM STDIN WITH (FORMAT csv)', buffer)
+    finally:
+        cursor.close()
+
+
+def insert_rows(connection, table, rows, batch_size=10000):
+    """Write ``rows`` (dicts with the same keys) to ``table`` in batches; returns how many."""
+    use_copy = connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+    written = 0
+    for batch in _batches(rows, batch_size):
+        if use_copy:
+            _copy(connection, table, batch)
+        else:
+            connection.execute(table.insert(), batch)
+        written += len(batch)
+    return written
+
+
+def sync_sequences(connection):
+    """Move Postgres id sequences past the explicitly inserted ids."""
+    if connection.dialect.name != 'postgresql':
+        return
+    preparer = connection.dialect.identifier_preparer
+    for table in db.metadata.sorted_tables:
+        column = table.c.get('id')
+        if column is None or not column.primary_key:
+            continue
+        name = preparer.format_table(table)
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence(:table, 'id'), coalesce(max(id), 1), max(id) IS NOT NULL) FROM {name}"),
+            {'table': name})
+
+
+def truncate_tables(connection):
+    """Delete every row of every model table and restart the id sequences."""
+    tables = db.metadata.sorted_tables
+    if connection.dialect.name == 'postgresql':
+        preparer = connection.dialect.identifier_preparer
+        names = ', '.join(preparer.format_table(t) for t in tables)
+        connection.execute(text(f'TRUNCATE TABLE {names} RESTART IDENTITY CASCADE'))
+        return
+    for table in reversed(tables):
+        connection.execute(table.delete())
+    if connection.dialect.name == 'sqlite' and connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'")).first():
+        connection.execute(text('DELETE FROM sqlite_sequence'))
+
+
+def is_empty(connection):
+    return connection.execute(select(func.count()).select_from(User.__table__)).scalar() == 0
+
+
+def seed_population(connection, password, students=200, instructors=10, courses=50, enrollments_per_student=5,
+                    batch_size=10000, rng_seed=12):
+    """Insert a synthetic population into empty tables.
+
+    Every student is enrolled in ``enrollments_per_student`` random courses
+    with a grade in each. Returns the id ranges of the students, instructors
+    and courses, and the number of rows written per table.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    instructor_ids = range(2, 2 + instructors)
+    student_ids = range(2 + instructors, 2 + instructors + students)
+    course_ids = range(1, courses + 1)
+
+    def users():
+        yield {'id': 1, 'username': 'admin', 'email': 'admin@example.com', 'password': password,
+               'is_admin': True, 'is_instructor': False, 'is_student': False}
+        for i in instructor_ids:
+            yield {'id': i, 'username': f'instructor{i}', 'email': f'instructor{i}@example.com', 'password': password,
+                   'is_admin': False, 'is_instructor': True, 'is_student': False}
+        for i in student_ids:
+            yield {'id': i, 'username': f'student{i}', 'email': f'student{i}@example.com', 'password': password,
+                   'is_admin': False, 'is_instructor': False, 'is_student': True}
+
+    def course_rows():
+        for c in course_ids:
+            yield {'id': c, 'name': f'Course {c}', 'duration': rng.randint(1, 12),
+                   'instructor_id': rng.choice(instructor_ids) if instructors else None, 'image': None,
+                   'modules': [{'title': f'Module {m}', 'content': f'Lesson text for module {m} of course {c}'}
+                               for m in range(5)],
+                   'created_at': now}
+
+    counts = {
+        'user': insert_rows(connection, User.__table__, users(), batch_size),
+        'instructor': insert_rows(connection, Instructor.__table__, (
+            {'id': i, 'is_instructor_verified': True} for i in instructor_ids), batch_size),
+        'student': insert_rows(connection, Student.__table__, ({'id': i} for i in student_ids), batch_size),
+        'course': insert_rows(connection, Course.__table__, course_rows(), batch_size),
+        'student_course': 0,
+        'grade': 0,
+    }
+    per_student = min(enrollments_per_student, courses)
+    # Enrollments and their grades are generated together, a batch of students at a time.
+    for chunk in _batches(student_ids, max(1, batch_size // max(1, per_student))):
+        pairs = [(s, c) for s in chunk for c in sorted(rng.sample(course_ids, per_student))]
+        counts['student_course'] += insert_rows(
+            connection, student_course, ({'student_id': s, 'course_id': c} for s, c in pairs), batch_size)
+        counts['grade'] += insert_rows(connection, Grade.__table__, (
+            {'student_id': s, 'course_id': c, 'grade': rng.choice(GRADE_LETTERS), 'comments': None, 'timestamp': now}
+            for s, c in pairs), batch_size)
+    sync_sequences(connection)
+    return {'students': student_ids, 'instructors': instructor_ids, 'courses': course_ids, 'rows': counts}
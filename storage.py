@@ -0,0 +1,200 @@
+import abc
+import atexit
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import send_from_directory
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class StorageBackend(abc.ABC):
+    """Where uploaded course images end up.
+
+    ``asynchronous`` backends talk to a remote service, so their ``save``
+    runs on the upload executor instead of the request thread.
+    """
+    asynchronous = False
+
+    @abc.abstractmethod
+    def save(self, path, name, content_type):
+        """Move the spooled file at ``path`` into storage as ``name``."""
+
+    @abc.abstractmethod
+    def exists(self, name):
+        """Whether ``name`` is stored; asked by every worker, not only the one that uploaded it."""
+
+    @abc.abstractmethod
+    def url(self, name):
+        """Public URL of a stored ``name``."""
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root, base_url):
+        self.root = root
+        self.base_url = base_url.rstrip('/')
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, path, name, content_type):
+        shutil.move(path, os.path.join(self.root, name))
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.root, name))
+
+    def url(self, name):
+        return f"{self.base_url}/{name}"
+
+
+class SupabaseStorage(StorageBackend):
+    asynchronous = True
+
+    def __init__(self, url, key, bucket):
+        self._settings = (url, key)
+        self.bucket = bucket
+        self._client = None
+
+    @property
+    def client(self):
+        # Built on first use so creating the app needs no network.
+        if self._client is None:
+            from supabase import create_client
+            self._client = create_client(*self._settings)
+        return self._client
+
+    def save(self, path, name, content_type):
+        with open(path, 'rb') as fh:
+            self.client.storage.from_(self.bucket).upload(
+                name, fh, {'content-type': content_type, 'upsert': 'true'})
+
+    def exists(self, name):
+        # A HEAD on the object, so a status poll or a repeated upload that lands
+        # on another worker still finds what this one stored.
+        return self.client.storage.from_(self.bucket).exists(name)
+
+    def url(self, name):
+        return self.client.storage.from_(self.bucket).get_public_url(name).rstrip('?')
+
+
+def _extension(filename):
+    return os.path.splitext(secure_filename(filename or ''))[1].lower()[:10]
+
+
+class ImageStorage:
+    """Streams course image uploads to the configured backend.
+
+    The upload is copied in chunks to a temporary file while it is hashed,
+    so it is never held in memory and anything over ``MAX_IMAGE_UPLOAD_BYTES``
+    is rejected early. Files are named after their sha256, so uploading the
+    same image twice stores it once. Remote backends finish the transfer on
+    a small thread pool; ``status(name)`` reports how that went. Pending and
+    failed transfers are only known to the worker that ran them; any other
+    worker answers from ``backend.exists``.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.max_bytes = 5 * 1024 * 1024
+        self.workers = 2
+        self._statuses = OrderedDict()
+        self._status_lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        kind = app.config.get('STORAGE_BACKEND', 'supabase')
+        if kind == 'local':
+            root = app.config.get('STORAGE_LOCAL_ROOT') or os.path.join(app.instance_path, 'uploads')
+            base_url = app.config.get('STORAGE_LOCAL_URL', '/media')
+            self.backend = LocalStorage(root, base_url)
+            app.add_url_rule(f"{self.backend.base_url}/<path:name>", 'media',
+                             lambda name: send_from_directory(root, name))
+        elif kind == 'supabase':
+            self.backend = SupabaseStorage(app.config.get('SUPABASE_URL'), app.config.get('SUPABASE_ANON_KEY'),
+                                           app.config.get('STORAGE_BUCKET', 'course_images'))
+        else:
+            raise ValueError(f"Unknown STORAGE_BACKEND: {kind}")
+        self.max_bytes = app.config.get('MAX_IMAGE_UPLOAD_BYTES', self.max_bytes)
+        self.workers = app.config.get('STORAGE_UPLOAD_WORKERS', self.workers)
+        app.extensions['image_storage'] = self
+
+    def _executor(self):
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='image-upload')
+                    self._pool_pid = os.getpid()
+                    atexit.register(self._pool.shutdown, wait=True)
+        return self._pool
+
+    def _set_status(self, name, status, error=None):
+        with self._status_lock:
+            self._statuses[name] = {'status': status, 'error': error}
+            self._statuses.move_to_end(name)
+            while len(self._statuses) > 1000:
+                self._statuses.popitem(last=False)
+
+    def status(self, name):
+        with self._status_lock:
+            known = self._statuses.get(name)
+        if known is None:
+            return {'status': 'ready' if self.backend.exists(name) else 'unknown', 'error': None}
+        return dict(known)
+
+    def _spool(self, file):
+        digest = hashlib.sha256()
+        size = 0
+        fd, path = tempfile.mkstemp(prefix='upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in iter(lambda: file.stream.read(CHUNK_SIZE), b''):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"Image must be at most {self.max_bytes} bytes")
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path, digest.hexdigest() + _extension(file.filename)
+
+    def _transfer(self, path, name, content_type):
+        try:
+            self.backend.save(path, name, content_type)
+            self._set_status(name, 'ready')
+        except Exception as e:
+            logger.error(f"Upload of {name} failed: {str(e)}", exc_info=True)
+            self._set_status(name, 'failed', str(e))
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def upload(self, file):
+        """Store an uploaded ``FileStorage``; returns (name, url, status)."""
+        path, name = self._spool(file)
+        current = self.status(name)['status']
+        if current in ('ready', 'pending'):
+            os.remove(path)
+            return name, self.backend.url(name), current
+        content_type = file.mimetype or 'application/octet-stream'
+        if not self.backend.asynchronous:
+            self._transfer(path, name, content_type)
+            return name, self.backend.url(name), self.status(name)['status']
+        self._set_status(name, 'pending')
+        self._executor().submit(self._transfer, path, name, content_type)
+        return name, self.backend.url(name), 'pending'
+
+
+image_storage = ImageStorage()
@@ -0,0 +1,41 @@
+import logging
+from flask import Response, current_app, request, stream_with_context
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+
+def wants_stream():
+    return request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+
+
+def stream_json_array(statement, serialize, on_batch=None):
+    """Stream the rows of ``statement`` as a JSON array.
+
+    Rows are fetched ``STREAM_BATCH_SIZE`` at a time through a server-side
+    cursor (``yield_per``) and encoded one by one, so neither the ORM objects
+    nor the encoded body are ever held in memory as a whole. ``on_batch`` is
+    called with each batch before it is serialized, e.g. to prime a loader.
+    """
+    batch_size = current_app.config.get('STREAM_BATCH_SIZE', 500)
+
+    def generate():
+        dumps = current_app.json.dumps
+        yield '['
+        separator = ''
+        try:
+            result = db.session.execute(statement.execution_options(yield_per=batch_size))
+            for batch in result.scalars().partitions():
+                if on_batch:
+                    on_batch(batch)
+                for row in batch:
+                    yield separator + dumps(serialize(row))
+                    separator = ','
+        except Exception:
+            # The status line is already sent; leave the array unterminated so
+            # the client sees a truncated body instead of a short, valid one.
+            logger.exception('Error while streaming response')
+            raise
+        yield ']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
@@ -0,0 +1,70 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app
+from authorization import identity_claims
+from cache import catalog_cache
+from config import Config
+from extensions import db
+from models import Course, Instructor, Student, User
+
+
+@pytest.fixture
+def app(tmp_path):
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'test.db'}"
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SECRET_KEY = 'test'
+        JWT_SECRET_KEY = 'test-secret-key-of-sufficient-length'
+        BCRYPT_LOG_ROUNDS = 4
+        PASSWORD_HASH_WORKERS = 0
+        RATELIMIT_ENABLED = False
+        STORAGE_BACKEND = 'local'
+        STORAGE_LOCAL_ROOT = str(tmp_path / 'uploads')
+        TESTING = True
+        DEBUG = False
+
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+    # Module-level caches outlive an app; ids repeat from one test to the next.
+    catalog_cache.pages.clear()
+    catalog_cache.courses.clear()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def school(app):
+    """An admin, a verified instructor teaching two courses, and two students."""
+    with app.app_context():
+        admin = User(username='admin', email='admin@example.com', password=b'x', is_admin=True)
+        teacher = User(username='teacher', email='teacher@example.com', password=b'x', is_instructor=True)
+        teacher.instructor = Instructor(is_instructor_verified=True)
+        students = []
+        for name in ('ada', 'bob'):
+            user = User(username=name, email=f'{name}@example.com', password=b'x', is_student=True)
+            user.student = Student()
+            students.append(user)
+        db.session.add_all([admin, teacher, *students])
+        db.session.flush()
+        courses = [Course(name=name, duration=3, instructor_id=teacher.id) for name in ('Maths', 'Physics')]
+        db.session.add_all(courses)
+        db.session.commit()
+        tokens = {user.username: create_access_token(identity=user.username, additional_claims=identity_claims(user))
+                  for user in (admin, teacher, *students)}
+        return {
+            'tokens': tokens,
+            'students': [user.id for user in students],
+            'courses': [course.id for course in courses],
+        }
+
+
+def auth(token):
+    return {'Authorization': f'Bearer {token}'}
@@ -0,0 +1,22 @@
+from cache import CatalogCache
+
+
+def test_missing_variant_counts_as_a_miss():
+    cache = CatalogCache()
+    cache.course(1, lambda: b'full')
+    cache.course(1, lambda: b'name', variant='name')
+    assert cache.course(1, lambda: b'stale') == b'full'
+
+    stats = cache.courses.stats()
+    assert (stats['hits'], stats['misses']) == (1, 2)
+
+
+def test_invalidate_during_build_does_not_cache_stale_body():
+    cache = CatalogCache()
+
+    def build():
+        cache.invalidate(1)
+        return b'stale'
+
+    assert cache.course(1, build) == b'stale'
+    assert cache.course(1, lambda: b'fresh') == b'fresh'
@@ -0,0 +1,51 @@
+from extensions import db
+from models import Grade
+from tests.conftest import auth
+from transcripts import get_transcript
+
+
+def transcript_courses(app, student_id):
+    with app.app_context():
+        return [g['course_id'] for g in get_transcript(student_id)['grades']]
+
+
+def test_admin_create_grade_accepts_string_ids(app, client, school):
+    ada, course = school['students'][0], school['courses'][0]
+    response = client.post('/api/admin/grades', headers=auth(school['tokens']['admin']),
+                           json={'student_id': str(ada), 'course_id': str(course), 'grade': 'A'})
+    assert response.status_code == 201
+    assert transcript_courses(app, ada) == [course]
+
+
+def test_admin_update_grade_accepts_string_student_id(app, client, school):
+    ada, bob = school['students']
+    with app.app_context():
+        grade = Grade(student_id=ada, course_id=school['courses'][0], grade='B')
+        db.session.add(grade)
+        db.session.commit()
+        grade_id = grade.id
+    response = client.put(f'/api/admin/grades/{grade_id}', headers=auth(school['tokens']['admin']),
+                          json={'student_id': str(bob)})
+    assert response.status_code == 200
+    assert transcript_courses(app, ada) == []
+    assert transcript_courses(app, bob) == [school['courses'][0]]
+
+
+def test_instructor_grade_routes_accept_string_ids(app, client, school):
+    ada, bob = school['students']
+    course = school['courses'][0]
+    headers = auth(school['tokens']['teacher'])
+    response = client.post('/api/instructors/grades', headers=headers,
+                           json={'student_id': str(ada), 'course_id': str(course), 'grade': 'A'})
+    assert response.status_code == 201
+    response = client.put(f"/api/instructors/grades/{response.get_json()['id']}", headers=headers,
+                          json={'student_id': str(bob)})
+    assert response.status_code == 200
+    assert transcript_courses(app, bob) == [course]
+
+
+def test_non_integer_ids_are_rejected(client, school):
+    response = client.post('/api/admin/grades', headers=auth(school['tokens']['admin']),
+                           json={'student_id': 'ada', 'course_id': school['courses'][0], 'grade': 'A'})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'student_id must be an integer'}
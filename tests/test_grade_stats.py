@@ -0,0 +1,32 @@
+from extensions import db
+from grade_stats import course_stats
+from models import Grade
+from tests.conftest import auth
+
+
+def distribution(app, course_id):
+    with app.app_context():
+        return course_stats(course_id)['distribution']
+
+
+def test_moving_a_grade_with_a_string_course_id(app, client, school):
+    maths, physics = school['courses']
+    with app.app_context():
+        grade = Grade(student_id=school['students'][0], course_id=maths, grade='A')
+        db.session.add(grade)
+        db.session.commit()
+        grade_id = grade.id
+    response = client.put(f'/api/admin/grades/{grade_id}', headers=auth(school['tokens']['admin']),
+                          json={'course_id': str(physics)})
+    assert response.status_code == 200
+    assert distribution(app, maths) == {}
+    assert distribution(app, physics) == {'A': 1}
+
+
+def test_counts_key_string_course_ids_as_ints(app, school):
+    maths = school['courses'][0]
+    with app.app_context():
+        db.session.add(Grade(student_id=school['students'][0], course_id=maths, grade='B'))
+        db.session.add(Grade(student_id=school['students'][1], course_id=str(maths), grade='B'))
+        db.session.commit()
+    assert distribution(app, maths) == {'B': 2}
@@ -0,0 +1,27 @@
+import pytest
+from extensions import password_hasher
+
+
+@pytest.fixture
+def hashes(monkeypatch):
+    calls = []
+    hash_password = password_hasher.hash
+    monkeypatch.setattr(password_hasher, 'hash', lambda *args, **kwargs: calls.append(args) or hash_password(*args, **kwargs))
+    return calls
+
+
+@pytest.mark.parametrize('body, message', [
+    ({'username': 'ada', 'email': 'new@example.com'}, 'Username already exists'),
+    ({'username': 'new', 'email': 'ada@example.com'}, 'Email already exists'),
+])
+def test_duplicate_signup_is_rejected_before_hashing(client, school, hashes, body, message):
+    response = client.post('/api/auth/signup', json={**body, 'password': 'secret'})
+    assert response.status_code == 400
+    assert response.get_json() == {'message': message}
+    assert hashes == []
+
+
+def test_signup_hashes_the_password(client, school, hashes):
+    response = client.post('/api/auth/signup', json={'username': 'new', 'email': 'new@example.com', 'password': 'secret'})
+    assert response.status_code == 201
+    assert len(hashes) == 1
@@ -0,0 +1,165 @@
+"""Per-student transcript documents, stored ready to serve.
+
+``student_transcript.document`` holds what /my-grades and /transcript
+return. It is rebuilt in the same transaction as the write that changes
+it: ORM grade writes through a session ``after_flush`` hook, Core bulk
+writes (grade_import.py, enrollments.py) by calling ``refresh_transcripts``.
+Renaming or deleting a course only clears the documents that mention it;
+those are rebuilt on their next read.
+"""
+from datetime import datetime
+from sqlalchemy import delete, event, inspect, null, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from extensions import db
+from grade_stats import GRADE_POINTS
+from models import Course, Grade, Student, StudentTranscript, student_course
+
+CHUNK_SIZE = 1000
+
+transcripts = StudentTranscript.__table__
+
+
+def _gpa(values):
+    points = [GRADE_POINTS[v.strip().upper()] for v in values if v.strip().upper() in GRADE_POINTS]
+    return round(sum(points) / len(points), 2) if points else None
+
+
+def build_transcripts(connection, student_ids):
+    """Transcript documents for ``student_ids`` as {student_id: document}."""
+    documents = {sid: {'student_id': sid, 'grades': [], 'courses': {}} for sid in student_ids}
+    if not documents:
+        return documents
+    grade_rows = connection.execute(
+        select(Grade.id, Grade.student_id, Grade.course_id, Grade.grade, Course.name)
+        .outerjoin(Course, Course.id == Grade.course_id)
+        .where(Grade.student_id.in_(documents))
+        .order_by(Grade.id))
+    for grade_id, student_id, course_id, value, course_name in grade_rows:
+        document = documents[student_id]
+        document['grades'].append({
+            'id': grade_id,
+            'course_id': course_id,
+            'grade': value,
+            'course': {'name': course_name} if course_name is not None else None,
+        })
+        if course_name is not None:
+            course = document['courses'].setdefault(course_id, {'id': course_id, 'name': course_name, 'grades': []})
+            course['grades'].append(value)
+    enrolled_rows = connection.execute(
+        select(student_course.c.student_id, Course.id, Course.name)
+        .join(Course, Course.id == student_course.c.course_id)
+        .where(student_course.c.student_id.in_(documents)))
+    for student_id, course_id, course_name in enrolled_rows:
+        documents[student_id]['courses'].setdefault(course_id, {'id': course_id, 'name': course_name, 'grades': []})
+    for document in documents.values():
+        document['courses'] = sorted(document['courses'].values(), key=lambda c: c['id'])
+        document['gpa'] = _gpa([str(g['grade']) for g in document['grades']])
+    return documents
+
+
+def _store(connection, documents):
+    now = datetime.utcnow()
+    rows = [{'student_id': sid, 'document': doc, 'gpa': doc['gpa'], 'updated_at': now}
+            for sid, doc in documents.items()]
+    dialect = connection.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = (postgresql if dialect == 'postgresql' else sqlite).insert(transcripts)
+        connection.execute(insert.on_conflict_do_update(
+            index_elements=[transcripts.c.student_id],
+            set_={'document': insert.excluded.document, 'gpa': insert.excluded.gpa,
+                  'updated_at': insert.excluded.updated_at}), rows)
+        return
+    connection.execute(transcripts.delete().where(transcripts.c.student_id.in_(documents)))
+    connection.execute(transcripts.insert(), rows)
+
+
+def refresh_transcripts(student_ids, connection=None):
+    """Rebuild and store the transcripts of ``student_ids`` in the current transaction."""
+    connection = connection if connection is not None else db.session.connection()
+    # Ids set from a JSON body may still be strings ("2") until the session reloads them.
+    student_ids = sorted({int(sid) for sid in student_ids if sid is not None})
+    for start in range(0, len(student_ids), CHUNK_SIZE):
+        chunk = student_ids[start:start + CHUNK_SIZE]
+        # Lock the existing rows first: a concurrent writer for the same
+        # student then waits, and the build below sees its committed grades.
+        connection.execute(select(transcripts.c.student_id).where(transcripts.c.student_id.in_(chunk))
+                           .order_by(transcripts.c.student_id).with_for_update())
+        _store(connection, build_transcripts(connection, chunk))
+
+
+def invalidate_course(connection, course_id):
+    """Clear the documents mentioning ``course_id``; they are rebuilt when next read."""
+    graded = select(Grade.student_id).where(Grade.course_id == course_id)
+    enrolled = select(student_course.c.student_id).where(student_course.c.course_id == course_id)
+    connection.execute(
+        update(transcripts)
+        .where(transcripts.c.student_id.in_(graded.union(enrolled).scalar_subquery()))
+        .values(document=null(), gpa=None))
+
+
+def get_transcript(student_id):
+    """Stored transcript for ``student_id``, building (and committing) it if missing or cleared."""
+    document = db.session.execute(
+        select(transcripts.c.document).where(transcripts.c.student_id == student_id)).scalar()
+    if document is None:
+        connection = db.session.connection()
+        document = build_transcripts(connection, [student_id])[student_id]
+        _store(connection, {student_id: document})
+        db.session.commit()
+    return document
+
+
+def backfill_transcripts(batch_size=CHUNK_SIZE):
+    """Build transcripts for every student, committing per batch; returns how many were written."""
+    written, last_id = 0, 0
+    while True:
+        ids = db.session.execute(
+            select(Student.id).where(Student.id > last_id).order_by(Student.id).limit(batch_size)).scalars().all()
+        if not ids:
+            return written
+        refresh_transcripts(ids)
+        db.session.commit()
+        written += len(ids)
+        last_id = ids[-1]
+
+
+def _old_value(state, key):
+    history = state.attrs[key].history
+    return history.deleted[0] if history.deleted else getattr(state.obj(), key)
+
+
+@event.listens_for(Session, 'before_flush')
+def _track_course_changes(session, flush_context, instances):
+    # Runs before the flush so a deleted course's enrollments are still there to find.
+    courses = {obj.id for obj in session.deleted if isinstance(obj, Course)}
+    courses.update(obj.id for obj in session.dirty
+                   if isinstance(obj, Course) and inspect(obj).attrs.name.history.has_changes())
+    if courses:
+        connection = session.connection()
+        for course_id in courses:
+            invalidate_course(connection, course_id)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_grade_changes(session, flush_context):
+    students = set()
+    for obj in session.new:
+        if isinstance(obj, Grade):
+            students.add(obj.student_id)
+    for obj in session.deleted:
+        if isinstance(obj, Grade):
+            students.add(_old_value(inspect(obj), 'student_id'))
+    for obj in session.dirty:
+        if isinstance(obj, Grade):
+            state = inspect(obj)
+            if any(state.attrs[k].history.has_changes() for k in ('student_id', 'course_id', 'grade')):
+                students.update((_old_value(state, 'student_id'), obj.student_id))
+    # A student deleted in this flush takes its transcript with it (SQLite
+    # does not enforce the ON DELETE CASCADE).
+    deleted = {obj.id for obj in session.deleted if isinstance(obj, Student)}
+    if deleted:
+        session.connection().execute(delete(StudentTranscript).where(StudentTranscript.student_id.in_(deleted)))
+        students -= deleted
+    if students:
+        refresh_transcripts(students, session.connection())